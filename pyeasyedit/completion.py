@@ -0,0 +1,511 @@
+import builtins
+import hashlib
+import os
+import sys
+import time
+import weakref
+from collections import OrderedDict
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.Qsci import QsciAPIs, QsciLexerPython
+
+from pyeasyedit.jedi_cache import JEDI_ENVIRONMENTS, PRELOAD_REGISTRY, is_stdlib_module
+from pyeasyedit.jedi_server import JediServerPool
+from pyeasyedit.profiling import PROFILER
+from pyeasyedit.themes import base_lexer_class
+from pyeasyedit.pyeasylib import ImportIndex, SignalEmitter, get_config_directory
+
+STDLIB_MODULES = getattr(sys, "stdlib_module_names", frozenset())
+
+
+def interpreter_tag(executable, version_info):
+    # Persisted candidate sets are only valid for the interpreter that produced them
+    digest = hashlib.sha1(os.path.abspath(executable).encode("utf-8")).hexdigest()[:12]
+    return f"py{version_info[0]}.{version_info[1]}.{version_info[2]}-{digest}"
+
+
+BUILTINS_NAME = "builtins-" + interpreter_tag(sys.executable, sys.version_info)  # dir(builtins) of this process
+
+
+def fuzzy_gaps(name, typed):
+    """
+    Returns how many characters had to be skipped to find typed as a subsequence
+    of name (both already lower-cased), or None if it is not one.
+    """
+    gaps = 0
+    position = 0
+    for char in typed:
+        found = name.find(char, position)
+        if found < 0:
+            return None
+        gaps += found - position
+        position = found + 1
+    return gaps
+
+
+def rank_completions(candidates, typed):
+    """
+    Filters Jedi's candidates by what has been typed since the completion point.
+    Case-sensitive prefix matches rank first, then case-insensitive prefixes, then
+    fuzzy subsequence matches with the fewest skipped characters. Ties keep Jedi's order.
+    """
+    if not typed:
+        return list(candidates)
+    lowered = typed.lower()
+    ranked = []
+    for order, name in enumerate(candidates):
+        if name.startswith(typed):
+            rank = (0, 0)
+        elif name.lower().startswith(lowered):
+            rank = (1, 0)
+        else:
+            gaps = fuzzy_gaps(name.lower(), lowered)
+            if gaps is None:
+                continue
+            rank = (2, gaps)
+        ranked.append((rank, order, name))
+    ranked.sort()
+    return [name for rank, order, name in ranked]
+
+
+class PreparedApiCache(QObject):
+    """
+    LRU cache of prepared QsciAPIs keyed by lexer language and candidate set.
+
+    QsciAPIs.prepare() builds its tables on a QScintilla background thread; a
+    cached entry is reused by any lexer of the same language. Stable sets such as
+    builtins and stdlib module members are keyed by their name instead, so they
+    are reused whatever candidates Jedi returns for them next time. Their names
+    carry the interpreter's version and a hash of its path. They are saved with
+    savePrepared() under ~/.pyeasyedit/apis and loaded with loadPrepared() in
+    later sessions. Python lexers start out with the builtins set, see
+    defaultApisFor.
+    """
+
+    def __init__(self, parent=None, capacity=16):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.entries = OrderedDict()  # (lexer class, digest or stable name) -> QsciAPIs
+        self.ownerLexers = {}  # lexer class -> lexer that owns that language's cached APIs
+        self.lexerKeys = weakref.WeakKeyDictionary()  # lexer -> key of the APIs it currently uses
+        self.hits = 0
+        self.misses = 0
+
+    def apisFor(self, lexer, words, persistentName=None):
+        key, api = self.entry(base_lexer_class(lexer), words, persistentName)
+        lexer.setAPIs(api)
+        self.lexerKeys[lexer] = key
+        return api
+
+    def defaultApisFor(self, lexer):
+        # Until Jedi has answered for it, a Python lexer completes from the pre-warmed builtins
+        if base_lexer_class(lexer) is not QsciLexerPython or lexer.apis() is not None:
+            return
+        key = (QsciLexerPython.__name__, BUILTINS_NAME)
+        api = self.entries.get(key)
+        if api is not None:
+            lexer.setAPIs(api)
+            self.lexerKeys[lexer] = key
+
+    def entry(self, lexerClass, words, persistentName=None):
+        if persistentName:
+            key = (lexerClass.__name__, persistentName)
+        else:
+            words = sorted(set(words))
+            key = (lexerClass.__name__, hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest())
+
+        api = self.entries.get(key)
+        if api is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return key, api
+
+        self.misses += 1
+        api = self.createApis(lexerClass, words, persistentName)
+        self.entries[key] = api
+        while len(self.entries) > self.capacity:
+            self.evict(*self.entries.popitem(last=False))
+        return key, api
+
+    def createApis(self, lexerClass, words, persistentName):
+        owner = self.ownerLexers.get(lexerClass)
+        if owner is None:
+            owner = lexerClass(self)
+            self.ownerLexers[lexerClass] = owner
+
+        api = QsciAPIs(owner)
+        for word in words:
+            api.add(word)
+
+        prepared_path = None
+        if persistentName:
+            file_name = f"{owner.language()}-{persistentName}.pap"
+            prepared_path = os.path.join(self.preparedDirectory(), file_name)
+            if os.path.exists(prepared_path) and api.loadPrepared(prepared_path):
+                return api
+            api.apiPreparationFinished.connect(lambda: api.savePrepared(prepared_path))
+        api.prepare()  # Runs on QScintilla's own worker thread
+        return api
+
+    def evict(self, key, api):
+        # Detach lexers still pointing at the entry before it is destroyed
+        for lexer, lexer_key in list(self.lexerKeys.items()):
+            if lexer_key == key and not sip.isdeleted(lexer):
+                lexer.setAPIs(None)
+                del self.lexerKeys[lexer]
+        api.cancelPreparation()
+        api.deleteLater()
+
+    def preparedDirectory(self):
+        directory = os.path.join(get_config_directory(), "apis")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def prewarmBuiltins(self):
+        words = [name for name in dir(builtins) if not name.startswith("_")]
+        self.entry(QsciLexerPython, words, BUILTINS_NAME)
+
+
+class CompletionSession:
+    """
+    One completion context: the identifier that starts at anchor on a given line.
+    Jedi is asked once, at the anchor, and later keystrokes inside the same
+    identifier are served by filtering the cached candidates.
+    """
+
+    def __init__(self, editor, showList=False):
+        position = editor.SendScintilla(editor.SCI_GETCURRENTPOS)
+        self.anchor = editor.SendScintilla(editor.SCI_WORDSTARTPOSITION, position, True)
+        self.line = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, self.anchor)
+        self.lineStart = editor.SendScintilla(editor.SCI_POSITIONFROMLINE, self.line)
+        self.lead = bytes(editor.rangeBuffer(self.lineStart, self.anchor))  # Text before the anchor
+        self.showList = showList
+        self.candidates = None  # Filled in when Jedi answers
+
+    def stdlibModule(self):
+        """
+        The stdlib module name in front of the dot (``os.``, ``json.``), if any.
+        Its members are only persisted once Jedi confirms the name really is that
+        module, see is_stdlib_module.
+        """
+        lead = self.lead.decode("utf-8", "replace")
+        if not lead.endswith("."):
+            return None
+        module = lead[:-1].split()[-1] if lead[:-1].split() else ""
+        if module.isidentifier() and module in STDLIB_MODULES:
+            return module
+        return None
+
+    def typedPrefix(self, editor):
+        """
+        Returns the identifier typed since the anchor, or None once the cursor has
+        left it or the text in front of it changed.
+        """
+        position = editor.SendScintilla(editor.SCI_GETCURRENTPOS)
+        if position < self.anchor or editor.SendScintilla(editor.SCI_LINEFROMPOSITION, position) != self.line:
+            return None
+        if editor.SendScintilla(editor.SCI_POSITIONFROMLINE, self.line) != self.lineStart:
+            return None
+        if editor.rangeBuffer(self.lineStart, self.anchor) != self.lead:
+            return None
+        typed = str(editor.rangeBuffer(self.anchor, position), "utf-8", "replace")
+        if typed and not typed.isidentifier():
+            return None
+        return typed
+
+
+class CompletionRequest:
+    """
+    Snapshot of everything a Jedi completion needs, taken on the UI thread so the
+    worker never touches the editor widget.
+    """
+
+    def __init__(self, editor, session, code, line, column, path, environment, project=None, server=None):
+        self.editor = editor
+        self.session = session
+        self.code = code
+        self.imports = editor.importIndex.modules()
+        self.line = line  # 1-indexed, as Jedi expects
+        self.column = column
+        self.path = path
+        self.environment = environment
+        self.project = project
+        self.server = server  # JediServerClient when completions run out of process
+        self.stdlibModule = session.stdlibModule()
+        self.completions = []
+        self.persistentName = None  # Set when the completions are the members of a stdlib module
+
+    def localRoots(self):
+        # Files here can shadow a stdlib module
+        return (str(self.project.path) if self.project else None, os.path.dirname(self.path or ""))
+
+    def setStdlibResolved(self, resolved):
+        if resolved:
+            environment = self.environment
+            self.persistentName = (f"stdlib-{self.stdlibModule}-"
+                                   f"{interpreter_tag(environment.executable, environment.version_info)}")
+
+    def isStale(self):
+        # Edits inside the session's identifier keep the answer useful, a new context does not
+        return self.session is not self.editor.completionSession
+
+
+class EnvironmentWarmer(QRunnable):
+    def __init__(self, projectRoot, signalEmitter):
+        super().__init__()
+        self.projectRoot = projectRoot
+        self.signalEmitter = signalEmitter
+
+    def run(self):
+        try:
+            with PROFILER.span("jedi.environment", "jedi"):
+                JEDI_ENVIRONMENTS.environment()
+                JEDI_ENVIRONMENTS.project(self.projectRoot)
+        except Exception as e:
+            self.signalEmitter.errorOccurred.emit(f"Error creating Jedi environment: {e}")
+            return
+        self.signalEmitter.environmentReady.emit()
+
+
+class PreloadWorker(QRunnable):
+    def __init__(self, modules, environmentKey, signalEmitter):
+        super().__init__()
+        self.modules = modules
+        self.environmentKey = environmentKey
+        self.signalEmitter = signalEmitter
+
+    def run(self):
+        for module in self.modules:
+            with PROFILER.span("jedi.preload", "jedi", module=module):
+                preloaded = PRELOAD_REGISTRY.preload(module, self.environmentKey)
+            if not preloaded:
+                self.signalEmitter.errorOccurred.emit(f"Error preloading module {module}")
+
+
+class JediCompletionWorker(QRunnable):
+    # Completions always run ahead of queued background preloads
+    PRELOAD_PRIORITY = -1
+
+    def __init__(self, request, signalEmitter, threadPool):
+        super().__init__()
+        self.request = request
+        self.signalEmitter = signalEmitter
+        self.threadPool = threadPool
+        self.setAutoDelete(False)  # The service keeps the Python reference alive until workerFinished
+
+    def run(self):
+        request = self.request
+        try:
+            if request.isStale():
+                return  # Superseded while waiting in the queue
+
+            if request.server is not None:
+                with PROFILER.span("jedi.complete", "jedi", path=request.path, server=True):
+                    result = request.server.complete(
+                        request.code, request.path, request.line, request.column,
+                        preload=request.imports,
+                        projectRoot=str(request.project.path) if request.project else None,
+                        isCancelled=request.isStale, module=request.stdlibModule
+                    )
+                if result is None:
+                    return  # Cancelled by a newer keystroke, timed out or the server died
+                request.completions, resolved = result
+                request.setStdlibResolved(resolved)
+                self.signalEmitter.completionsFetched.emit(request)
+                return
+
+            # New imports are preloaded once, in the background, after this completion
+            environment_key = request.environment.executable
+            missing = PRELOAD_REGISTRY.claimMissing(request.imports, environment_key)
+            if missing:
+                preloader = PreloadWorker(missing, environment_key, self.signalEmitter)
+                self.threadPool.start(preloader, self.PRELOAD_PRIORITY)
+
+            import jedi  # Already loaded by the environment warm-up in the usual case
+            with PROFILER.span("jedi.complete", "jedi", path=request.path, server=False):
+                script = jedi.Script(code=request.code, path=request.path,
+                                     environment=request.environment, project=request.project)
+                completions = script.complete(line=request.line, column=request.column)
+            request.completions = [comp.name for comp in completions]
+            if request.stdlibModule:
+                request.setStdlibResolved(is_stdlib_module(script, request.line, request.column - 1,
+                                                           request.stdlibModule, request.localRoots()))
+            self.signalEmitter.completionsFetched.emit(request)
+        except Exception as e:
+            self.signalEmitter.errorOccurred.emit(f"Error fetching completions: {e}")
+        finally:
+            self.signalEmitter.workerFinished.emit(self)
+
+
+class CompletionService(QObject):
+    """
+    Debounced, cancellable Jedi completions run off the UI thread.
+
+    Each editor has at most one CompletionSession. Typing inside the session's
+    identifier only re-filters its cached candidates; moving to a new context
+    starts a new session and, once typing pauses, one new Jedi request. Results
+    for a session that has since been replaced are dropped.
+    """
+    completionsReady = pyqtSignal(object)
+    errorOccurred = pyqtSignal(str)
+    environmentReady = pyqtSignal()  # A warm-up finished, Jedi can be attached without blocking
+
+    def __init__(self, parent=None, debounceInterval=250):
+        super().__init__(parent)
+        self.debounceInterval = debounceInterval
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(1)  # Jedi is not thread safe, keep inference serialised
+        self.signalEmitter = SignalEmitter()
+        self.signalEmitter.completionsFetched.connect(self.onCompletionsFetched)
+        self.signalEmitter.errorOccurred.connect(self.errorOccurred)
+        self.signalEmitter.environmentReady.connect(self.environmentReady)
+        self.signalEmitter.workerFinished.connect(self.onWorkerFinished)
+        self.pendingWorkers = {}  # Latest queued worker per editor
+        self.activeWorkers = set()
+        self.serverPool = None  # Set when completions run in a child process
+        self.jediRequests = 0
+        self.filteredRefinements = 0
+
+    def setUseCompletionServer(self, enabled):
+        if enabled and self.serverPool is None:
+            self.serverPool = JediServerPool()
+        elif not enabled and self.serverPool is not None:
+            serverPool, self.serverPool = self.serverPool, None
+            self.clearQueue()
+            serverPool.shutdown()
+
+    def clearQueue(self):
+        # Drops queued work and waits for the running job. Dropped PreloadWorkers never
+        # run, so their modules must stop counting as scheduled or they are never preloaded
+        self.threadPool.clear()
+        self.threadPool.waitForDone()
+        PRELOAD_REGISTRY.releaseScheduled()
+
+    def warmEnvironment(self, projectRoot):
+        # Jumps the queue so the first completion finds the environment ready
+        self.threadPool.start(EnvironmentWarmer(projectRoot, self.signalEmitter), 1)
+
+    def attach(self, editor):
+        editor.completionService = self
+        editor.importIndex = ImportIndex(editor)
+        editor.keystrokeTime = None  # Last edit not yet answered by a completion list, for the latency histograms
+        editor.completionDebounceTimer.timeout.connect(lambda: self.requestCompletions(editor))
+        editor.completionRefineTimer.timeout.connect(lambda: self.refineSession(editor))
+
+    def detach(self, editor):
+        # Orphan anything still in flight so a closed tab never receives results
+        editor.completionDebounceTimer.stop()
+        editor.completionRefineTimer.stop()
+        editor.completionSession = None
+        self.cancel(editor)
+
+    def documentChanged(self, editor):
+        editor.keystrokeTime = time.perf_counter()
+        # textChanged fires before Scintilla moves the caret past the edit, so look
+        # at the session once the keystroke has been fully processed
+        editor.completionRefineTimer.start(0)
+
+    def refineSession(self, editor):
+        session = editor.completionSession
+        typed = session.typedPrefix(editor) if session is not None else None
+        if typed is None:
+            # New context: Jedi is asked again once typing pauses
+            self.cancel(editor)
+            editor.completionSession = CompletionSession(editor)
+            editor.completionDebounceTimer.start(self.debounceInterval)
+            return
+
+        if session.candidates is None:
+            return  # Jedi has not answered yet, the answer is filtered on arrival
+        self.filteredRefinements += 1
+        self.showSessionCompletions(editor, session, typed, refresh=True)
+
+    def showSessionCompletions(self, editor, session, typed, refresh=False):
+        items = rank_completions(session.candidates, typed)
+        editor.AContainer.itemList = items
+        if not session.showList or not items:
+            return
+        # Keep an open list in step with typing, but don't reopen one the user dismissed
+        if not refresh or editor.isListActive():
+            editor.showUserList(1, items)
+            self.recordLatency(editor, "keystroke to completion (filtered)" if refresh else
+                               "keystroke to completion (jedi)")
+
+    def recordLatency(self, editor, name):
+        # Only the first list shown after an edit counts
+        keystroke_time, editor.keystrokeTime = editor.keystrokeTime, None
+        if keystroke_time is not None:
+            PROFILER.recordLatency(name, time.perf_counter() - keystroke_time)
+
+    def cancel(self, editor):
+        worker = self.pendingWorkers.pop(id(editor), None)
+        if worker is not None and self.threadPool.tryTake(worker):
+            self.activeWorkers.discard(worker)
+
+    def requestCompletions(self, editor, showList=False):
+        if getattr(editor, 'jedi_environment', None) is None:
+            return
+        editor.completionDebounceTimer.stop()
+        self.cancel(editor)
+
+        session = editor.completionSession
+        if showList or session is None or session.typedPrefix(editor) is None:
+            session = CompletionSession(editor, showList)
+            editor.completionSession = session
+
+        server = None
+        if self.serverPool is not None:
+            server = self.serverPool.client(editor.jedi_environment.executable)
+
+        # Ask at the anchor so the answer covers every identifier the session can become
+        anchor_line, anchor_column = editor.lineIndexFromPosition(session.anchor)
+        request = CompletionRequest(
+            editor, session, editor.documentText(), anchor_line + 1, anchor_column,
+            editor.AContainer.current_file_path, editor.jedi_environment,
+            getattr(editor, 'jedi_project', None), server
+        )
+        self.jediRequests += 1
+        worker = JediCompletionWorker(request, self.signalEmitter, self.threadPool)
+        self.pendingWorkers[id(editor)] = worker
+        self.activeWorkers.add(worker)
+        self.threadPool.start(worker)
+
+    def onWorkerFinished(self, worker):
+        self.activeWorkers.discard(worker)
+        editor_id = id(worker.request.editor)
+        if self.pendingWorkers.get(editor_id) is worker:
+            del self.pendingWorkers[editor_id]
+
+    def onCompletionsFetched(self, request):
+        editor = request.editor
+        if request.isStale():
+            return
+
+        session = request.session
+        typed = session.typedPrefix(editor)
+        if typed is None:
+            return  # The caret left the context while Jedi was working
+        session.candidates = request.completions
+        self.showSessionCompletions(editor, session, typed)
+        # Feed the full candidate set to the lexer's APIs for Scintilla's own autocompletion
+        editor.AContainer.showUserListSignal.emit(1, session.candidates, request.persistentName or "")
+        self.completionsReady.emit(request)
+
+    def sessionStats(self):
+        return {"jedi_requests": self.jediRequests, "filtered_refinements": self.filteredRefinements}
+
+    def preloadStats(self):
+        stats = {"in_process": PRELOAD_REGISTRY.stats()}
+        if self.serverPool is not None:
+            for environment_path, client in self.serverPool.clients.items():
+                if client.lastPreloadStats:
+                    stats[environment_path] = client.lastPreloadStats
+        return stats
+
+    def shutdown(self):
+        self.pendingWorkers.clear()
+        self.clearQueue()
+        self.activeWorkers.clear()
+        if self.serverPool is not None:
+            self.serverPool.shutdown()
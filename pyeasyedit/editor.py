@@ -0,0 +1,1620 @@
+import ctypes
+import logging
+import os
+import sys
+import time
+from PyQt6.QtWidgets import QApplication, QTabWidget, QInputDialog, QMenuBar, QLabel, QLineEdit, QPushButton, QDialog, \
+    QMenu, QTextBrowser
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, QRunnable, QThreadPool, QObject, pyqtSlot, QTimer
+from PyQt6.QtGui import QAction, QShortcut, QKeySequence, QPixmap, QKeyEvent
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QMessageBox, QFileDialog, QProgressBar, QSplitter
+from PyQt6.Qsci import QsciScintilla, QsciAPIs, QsciLexerPython
+from pyeasyedit.completion import CompletionService, PreparedApiCache
+from pyeasyedit.findinfiles import FindInFilesPanel
+from pyeasyedit.hibernation import HIBERNATE_AFTER_MINUTES, MemoryBudgetManager, document_memory, read_swap, \
+    release_swap_directory, remove_stale_swaps, remove_swap, write_swap
+from pyeasyedit.fileio import EOL_MODES, AtomicSaveThread, DocumentReader, FileLoaderThread, atomic_write, \
+    read_document
+from pyeasyedit.jedi_cache import JEDI_ENVIRONMENTS
+from pyeasyedit.profiling import PROFILER, profiled
+from pyeasyedit.search import replace_all
+from pyeasyedit.session import load_session, save_session
+from pyeasyedit.pyeasylib import AboutDialog, get_config_directory, LEXER_MAP_EXTENSIONS, LEXER_MAP_MENU, \
+    create_lexer, load_recent_files, save_recent_files, load_settings, save_settings, HotkeysDialog, SearchDialog, \
+    ReplaceDialog
+from pyeasyedit.startup import FIRST_PAINT_FALLBACK_MS, FirstPaintWatcher
+from pyeasyedit.themes import DEFAULT_THEME, THEME_ENGINE
+
+logger = logging.getLogger(__name__)
+
+
+class CustomQsciScintilla(QsciScintilla):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.currentListItem = ""
+        self.currentListIndex = -1  # Default to -1 indicating no selection
+        self.userListActivated.connect(self.onUserListActivated)
+        self.completionService = None  # Set by CompletionService.attach for Jedi-enabled editors
+        self.completionDebounceTimer = QTimer(self)
+        self.completionDebounceTimer.setSingleShot(True)
+        self.completionRefineTimer = QTimer(self)
+        self.completionRefineTimer.setSingleShot(True)
+        self.completionSession = None  # Current CompletionSession, see completion.py
+
+    # Document access without copying the whole text. Scintilla stores the document
+    # as UTF-8 bytes; the memoryviews below point straight into that buffer and are
+    # only valid until the document is next modified, so use them and drop them.
+
+    def documentBuffer(self):
+        """
+        Read-only memoryview over the whole document. SCI_GETCHARACTERPOINTER moves
+        the gap to the end so the text is contiguous.
+        """
+        length = self.SendScintilla(self.SCI_GETLENGTH)
+        if not length:
+            return memoryview(b"")
+        return self._bufferAt(self.SendScintilla(self.SCI_GETCHARACTERPOINTER), length)
+
+    def rangeBuffer(self, start, end):
+        """
+        Read-only memoryview over [start, end). SCI_GETRANGEPOINTER only moves the gap
+        if it falls inside the range, which is rare for ranges before the caret.
+        """
+        length = max(0, min(end, self.SendScintilla(self.SCI_GETLENGTH)) - start)
+        if not length:
+            return memoryview(b"")
+        return self._bufferAt(self.SendScintilla(self.SCI_GETRANGEPOINTER, start, length), length)
+
+    def _bufferAt(self, pointer, length):
+        return memoryview((ctypes.c_char * length).from_address(pointer)).cast("B").toreadonly()
+
+    def documentText(self):
+        # One decode from the buffer instead of text()'s QString round trip
+        return str(self.documentBuffer(), "utf-8", "replace")
+
+    def lineWindow(self, line, before=0, after=0):
+        """
+        Text of lines line - before to line + after, without the final line end.
+        """
+        first = max(0, line - before)
+        last = min(self.lines() - 1, line + after)
+        start = self.SendScintilla(self.SCI_POSITIONFROMLINE, first)
+        end = self.SendScintilla(self.SCI_GETLINEENDPOSITION, last)
+        return str(self.rangeBuffer(start, end), "utf-8", "replace")
+
+
+    def onUserListActivated(self, index, text):
+        self.currentListItem = text
+        self.currentListIndex = index
+
+        # Get the cursor position
+        line, column = self.getCursorPosition()
+        pos = self.positionFromLineIndex(line, column)
+
+        # Find the position of the last period before the cursor
+        last_period_pos = self.SendScintilla(self.SCI_POSITIONBEFORE, pos)
+        while last_period_pos > 0 and chr(self.SendScintilla(self.SCI_GETCHARAT, last_period_pos)) != '.':
+            last_period_pos = self.SendScintilla(self.SCI_POSITIONBEFORE, last_period_pos)
+
+        # Check if the last character is a period and adjust the position
+        if last_period_pos >= 0 and chr(self.SendScintilla(self.SCI_GETCHARAT, last_period_pos)) == '.':
+            last_period_pos += 1
+
+        # Set the selection and replace the text
+        self.SendScintilla(self.SCI_SETSEL, last_period_pos, pos)
+        self.SendScintilla(self.SCI_REPLACESEL, 0, text.encode())
+
+        # Correctly position the cursor after insertion
+        new_pos = last_period_pos + len(text)
+        new_line, new_index = self.lineIndexFromPosition(new_pos)
+        self.setCursorPosition(new_line, new_index)
+
+        logger.debug("List activated: text=%r index=%d replaced=%d-%d", text, index, last_period_pos, column)
+
+    def keyPressEvent(self, event: QKeyEvent):
+        super().keyPressEvent(event)
+        if self.isListActive():
+            if event.key() in [Qt.Key.Key_Tab, Qt.Key.Key_Return]:
+                if self.currentListItem:
+                    self.insert(self.currentListItem)
+                    self.SendScintilla(self.SCI_CANCEL)
+                    new_line, new_index = self.getCursorPosition()
+                    self.setCursorPosition(new_line, new_index + len(self.currentListItem))
+                    event.accept()
+                    return
+
+        if event.text() == '.':
+            self.triggerJediCompletion()
+
+    def triggerJediCompletion(self):
+        # Results arrive asynchronously, the service shows the list once they are ready
+        if self.completionService:
+            self.completionService.requestCompletions(self, showList=True)
+
+
+class QScintillaEditorWidget(QWidget):
+    fileSaved = pyqtSignal(str)
+    fileLoaded = pyqtSignal(str)
+    loadCancelled = pyqtSignal()
+    loadFailed = pyqtSignal(str)
+    largeFileModeChanged = pyqtSignal(bool)
+
+    LARGE_FILE_THRESHOLD = 20 * 1024 * 1024  # Bytes, overridden by "large_file_threshold_mb" in config.json
+    # Scintilla styles from the start of the file up to the lines it paints, so scrolling to the end
+    # of a large file styles all of it. Files above this size get no lexer in large file mode
+    LARGE_FILE_LEXER_LIMIT = 100 * 1024 * 1024
+    FOLD_MARKERS = (
+        (QsciScintilla.MarkerSymbol.BoxedMinus, QsciScintilla.SC_MARKNUM_FOLDEROPEN),
+        (QsciScintilla.MarkerSymbol.BoxedPlus, QsciScintilla.SC_MARKNUM_FOLDER),
+        (QsciScintilla.MarkerSymbol.BoxedMinusConnected, QsciScintilla.SC_MARKNUM_FOLDEROPENMID),
+        (QsciScintilla.MarkerSymbol.BoxedPlusConnected, QsciScintilla.SC_MARKNUM_FOLDEREND),
+        (QsciScintilla.MarkerSymbol.VerticalLine, QsciScintilla.SC_MARKNUM_FOLDERSUB),
+        (QsciScintilla.MarkerSymbol.BoxedMinusConnected, QsciScintilla.SC_MARKNUM_FOLDERMIDTAIL),
+        (QsciScintilla.MarkerSymbol.BoxedPlusConnected, QsciScintilla.SC_MARKNUM_FOLDERTAIL),
+    )
+    showUserListSignal = pyqtSignal(int, list, str)  # List id, candidates, name to persist them under
+
+
+    def __init__(self, defaultFolderPath, parent=None, apiCache=None):
+        super().__init__(parent)
+        self.defaultFolderPath = defaultFolderPath  # Store the path as an instance attribute
+        self.apiCache = apiCache  # Shared PreparedApiCache
+        self.apiCompletionConfigured = False
+        self.fileEncoding = "utf-8"
+        self.loaderThread = None
+        self.saveThread = None
+        self.largeFileThreshold = self.LARGE_FILE_THRESHOLD
+        self.largeFileMode = False
+        self.fileSize = 0
+        self.pendingModified = False  # The next load brings back unsaved changes from a swap file
+        self.current_file_path = None  # To keep track of the current file path
+        self.splitEditor = None  # Second view of the same document, see splitView
+        self.itemList = []
+        self.setupUi()
+        self.showUserListSignal.connect(self.showUserList)  # Connect signal to slot
+
+    @profiled("showUserList")
+    def showUserList(self, listId=1, itemList=None, persistentName=""):
+        itemList = self.itemList if itemList is None else itemList
+        if self.editor and itemList:
+            lexer = self.editor.lexer()
+            if lexer and self.apiCache:
+                self.apiCache.apisFor(lexer, itemList, persistentName or None)
+                if not self.apiCompletionConfigured:
+                    self.configureApiCompletion()
+
+    def configureApiCompletion(self):
+        self.editor.setAutoCompletionSource(QsciScintilla.AutoCompletionSource.AcsAPIs)
+        # Set auto-completion settings to always show the list
+        self.editor.setAutoCompletionUseSingle(
+            QsciScintilla.AutoCompletionUseSingle.AcusNever)  # Important change here
+        self.editor.setAutoCompletionCaseSensitivity(True)
+        self.editor.setAutoCompletionReplaceWord(True)
+        self.editor.setAutoCompletionThreshold(1)  # Adjust if needed
+        self.editor.setAutoCompletionWordSeparators(['.'])  # Trigger on dot
+        self.apiCompletionConfigured = True
+
+    def setupUi(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        # Initialize the QScintilla editor, in a splitter that can take a second view
+        self.editor = CustomQsciScintilla()
+        self.splitter = QSplitter()
+        self.splitter.addWidget(self.editor)
+        layout.addWidget(self.splitter)
+
+        # Progress bar shown while a large file streams in
+        self.loadingBar = QWidget()
+        loadingLayout = QHBoxLayout(self.loadingBar)
+        loadingLayout.setContentsMargins(0, 0, 0, 0)
+        self.loadingLabel = QLabel("Loading...")
+        loadingLayout.addWidget(self.loadingLabel)
+        self.loadingProgress = QProgressBar()
+        loadingLayout.addWidget(self.loadingProgress)
+        self.loadingCancelButton = QPushButton("Cancel")
+        self.loadingCancelButton.clicked.connect(self.cancelLoad)
+        loadingLayout.addWidget(self.loadingCancelButton)
+        self.loadingBar.hide()
+        layout.addWidget(self.loadingBar)
+
+        # Shown while a background save writes straight from the document, which is read-only until then
+        self.savingLabel = QLabel()
+        self.savingLabel.hide()
+        layout.addWidget(self.savingLabel)
+
+        # Status shown while expensive features are off for a large file
+        self.largeFileBar = QWidget()
+        largeFileLayout = QHBoxLayout(self.largeFileBar)
+        largeFileLayout.setContentsMargins(0, 0, 0, 0)
+        self.largeFileLabel = QLabel()
+        largeFileLayout.addWidget(self.largeFileLabel, 1)
+        self.fullFeaturesButton = QPushButton("Enable Full Features")
+        self.fullFeaturesButton.clicked.connect(self.exitLargeFileMode)
+        largeFileLayout.addWidget(self.fullFeaturesButton)
+        self.largeFileBar.hide()
+        layout.addWidget(self.largeFileBar)
+
+        # Enable line numbers in the left margin
+        self.editor.setMarginType(0, QsciScintilla.MarginType.NumberMargin)
+        self.editor.setMarginWidth(0, "0000")  # Adjust the number as needed
+        self.editor.setEolVisibility(False)
+        self.editor.setMarginWidth(1, "0000")
+        self.editor.setAutoIndent(True)
+        self.editor.setBraceMatching(QsciScintilla.BraceMatch.SloppyBraceMatch)
+        self.saveShortcut = QShortcut(QKeySequence("Ctrl+S"), self.editor)
+        self.saveShortcut.activated.connect(self.saveFile)
+        self.configureFolding()  # Setup folding for the editor
+        # Connect the fold margin click event to the handler
+        self.editor.marginClicked.connect(self.onMarginClicked)
+        self.completionShortcut = QShortcut(QKeySequence('Ctrl+Space'), self.editor)
+        self.completionShortcut.activated.connect(self.triggerCompletion)
+
+    def triggerCompletion(self):
+        # if not self.editor.isListActive():
+        logger.debug("Completion list triggered: items=%d", len(self.itemList))
+        self.editor.showUserList(1, self.itemList)
+
+    def configureFolding(self):
+        # Assuming Python lexer, but you might want to set this dynamically
+        lexer = QsciLexerPython(self.editor)
+        self.editor.setLexer(lexer)
+
+        # Enable folding
+        self.editor.setFolding(QsciScintilla.FoldStyle.BoxedTreeFoldStyle)
+
+        # Configure the margin for folding symbols
+        self.editor.setMarginType(2, QsciScintilla.MarginType.SymbolMargin)
+        self.editor.setMarginWidth(2, "12")
+        self.editor.setMarginSensitivity(2, True)
+
+        # Define markers using the correct constants from your list of available symbols
+        for symbol, marker in self.FOLD_MARKERS:
+            self.editor.markerDefine(symbol, marker)
+        self.applyTheme()
+
+    def onMarginClicked(self, nmargin, nline, modifiers):
+        # Folds are per view, toggle it in the view that was clicked
+        editor = self.sender() or self.editor
+        # Check if the clicked margin is the fold margin (number 2 in this setup)
+        if nmargin == 2:
+            # Toggle the fold state if the clicked line is foldable (has a fold point)
+            if editor.foldingAt(nline):
+                editor.toggleFold(nline)
+
+    def applyTheme(self, theme=None):
+        # Changing the lexer resets the margin and brace colours, so this follows every setLexer
+        theme = theme or THEME_ENGINE.current()
+        lexer = self.editor.lexer()
+        if lexer is not None and getattr(lexer, "theme", None) is not theme:
+            theme.styleLexer(lexer)
+        theme.styleEditor(self.editor)
+        if self.splitEditor is not None:
+            self.styleSplitView(theme)
+
+    def views(self):
+        # The editor and, when split, the second view of its document
+        return [self.editor] if self.splitEditor is None else [self.editor, self.splitEditor]
+
+    def activeView(self):
+        # The view the user is working in
+        if self.splitEditor is not None and self.splitEditor.hasFocus():
+            return self.splitEditor
+        return self.editor
+
+    def splitView(self, orientation=Qt.Orientation.Horizontal):
+        """
+        Shows a second view of the document, side by side with the editor
+        (Horizontal) or below it (Vertical). Both views display the same Scintilla
+        document, so there is one buffer and one undo history and nothing is
+        copied or kept in sync. Not available while the file is loading.
+        """
+        if self.isLoading():
+            return False
+        if self.splitEditor is None:
+            self.splitEditor = CustomQsciScintilla()
+            self.splitEditor.AContainer = self
+            # Configured while its own document is still empty, setLexer styles the whole document
+            self.configureSplitView()
+            # QsciDocument is QScintilla's wrapper for SCI_GETDOCPOINTER/SCI_ADDREFDOCUMENT,
+            # the document is released with its last view
+            self.splitEditor.setDocument(self.editor.document())
+            self.splitEditor.marginClicked.connect(self.onMarginClicked)
+            self.splitter.addWidget(self.splitEditor)
+            line, column = self.editor.getCursorPosition()
+            self.splitEditor.setCursorPosition(line, column)
+            self.splitEditor.setFirstVisibleLine(self.editor.firstVisibleLine())
+        self.splitter.setOrientation(orientation)
+        self.splitter.setSizes([1, 1])  # Equal halves
+        self.splitEditor.setFocus()
+        return True
+
+    def unsplitView(self):
+        if self.splitEditor is None:
+            return
+        splitEditor, self.splitEditor = self.splitEditor, None
+        splitEditor.hide()
+        splitEditor.deleteLater()
+        self.editor.setFocus()
+
+    def configureSplitView(self):
+        # Scintilla keeps margins, folds, markers and brace matching per view, copy the editor's
+        view = self.splitEditor
+        self.styleSplitView(THEME_ENGINE.current())
+        view.setFolding(self.editor.folding())  # Before the margins, it resets the fold margin's width
+        for margin in range(3):
+            view.setMarginType(margin, self.editor.marginType(margin))
+            view.setMarginWidth(margin, self.editor.marginWidth(margin))
+            view.setMarginSensitivity(margin, self.editor.marginSensitivity(margin))
+        for symbol, marker in self.FOLD_MARKERS:
+            view.markerDefine(symbol, marker)
+        view.setBraceMatching(self.editor.braceMatching())
+        view.setAutoIndent(self.editor.autoIndent())
+        view.setIndentationWidth(self.editor.indentationWidth())
+        view.setIndentationsUseTabs(self.editor.indentationsUseTabs())
+        view.setAutoCompletionSource(self.editor.autoCompletionSource())
+        view.setAutoCompletionThreshold(self.editor.autoCompletionThreshold())
+        view.SendScintilla(QsciScintilla.SCI_SETIDLESTYLING,
+                           self.editor.SendScintilla(QsciScintilla.SCI_GETIDLESTYLING))
+
+    def styleSplitView(self, theme):
+        # Same lexer class as the editor, both style the shared document the same way
+        view = self.splitEditor
+        lexer = self.editor.lexer()
+        if lexer is None:
+            if view.lexer() is not None:
+                view.setLexer(None)
+        elif type(view.lexer()) is not type(lexer):
+            view.setLexer(type(lexer)(view))
+            if self.largeFileMode:
+                self.stopFoldLevels(view)
+        if view.lexer() is not None and getattr(view.lexer(), "theme", None) is not theme:
+            theme.styleLexer(view.lexer())
+        theme.styleEditor(view)
+
+    def enterLargeFileMode(self):
+        # The lexer stays below LARGE_FILE_LEXER_LIMIT, styling runs as far as the lines painted
+        self.largeFileMode = True
+        highlighting = ("lines are highlighted as far as they are shown"
+                        if self.hasLargeFileLexer() else "highlighting is off")
+        self.largeFileLabel.setText(
+            f"Large file mode: folding, brace matching and completion are off, {highlighting}.")
+        self.stopFoldLevels(self.editor)
+        self.editor.setFolding(QsciScintilla.FoldStyle.NoFoldStyle)
+        self.editor.setMarginWidth(2, 0)
+        self.editor.setBraceMatching(QsciScintilla.BraceMatch.NoBraceMatch)
+        self.editor.setAutoCompletionSource(QsciScintilla.AutoCompletionSource.AcsNone)
+        # Scintilla's default, kept in case it was changed: no styling of the rest of the document
+        # in idle time, only what painting needs
+        self.editor.SendScintilla(QsciScintilla.SCI_SETIDLESTYLING, QsciScintilla.SC_IDLESTYLING_NONE)
+        self.largeFileBar.show()
+        if self.splitEditor is not None:
+            self.configureSplitView()
+        self.largeFileModeChanged.emit(True)
+
+    def hasLargeFileLexer(self):
+        return self.fileSize < self.LARGE_FILE_LEXER_LIMIT
+
+    def stopFoldLevels(self, editor):
+        # A lexer works out fold levels for every line it styles unless its fold property is off,
+        # setLexer turns it back on
+        editor.SendScintilla(QsciScintilla.SCI_SETPROPERTY, b"fold", b"0")
+
+    def exitLargeFileMode(self):
+        # Manual override, the user accepts the cost for this file
+        self.largeFileMode = False
+        self.largeFileBar.hide()
+        self.configureFolding()
+        self.editor.setAutoCompletionSource(QsciScintilla.AutoCompletionSource.AcsAll)
+        if self.current_file_path:
+            self.setLexerForFile(self.current_file_path)
+        if self.splitEditor is not None:
+            self.configureSplitView()
+        self.largeFileModeChanged.emit(False)
+
+    @profiled("setLexerForFile")
+    def setLexerForFile(self, filePath):
+        # Retrieve the file extension and select the appropriate custom lexer
+        extension = os.path.splitext(filePath)[1].lower()
+        lexer_name = LEXER_MAP_EXTENSIONS.get(extension)
+
+        # A fresh lexer per editor (it carries the editor's completion APIs), styled from the cached table
+        self.useLexer(lexer_name)
+
+    def loadFile(self, filePath, document=None):
+        # Small files are read in one go, anything bigger streams in from a worker thread.
+        # document is (utf8_bytes, encoding, eol) when the file was already read ahead
+        self.current_file_path = filePath
+        try:
+            size = len(document[0]) if document is not None else os.path.getsize(filePath)
+        except OSError as e:
+            self.loadFailed.emit(str(e))  # e.g. a placeholder tab whose file has gone
+            return
+        self.fileSize = size
+        if size >= self.largeFileThreshold and not self.largeFileMode:
+            self.enterLargeFileMode()
+        if document is not None or size <= FileLoaderThread.CHUNK_SIZE:
+            try:
+                data, encoding, eol = document or read_document(filePath)
+            except (OSError, ValueError) as e:
+                self.loadFailed.emit(str(e))
+                return
+            self.beginLoad()
+            self.appendChunk(data)
+            self.finishLoad(encoding, eol)
+            return
+
+        self.beginLoad()
+        self.loadingLabel.setText(f"Loading {os.path.basename(filePath)}...")
+        self.loadingProgress.setValue(0)
+        self.loadingBar.show()
+
+        self.loaderThread = FileLoaderThread(filePath, self)
+        self.loaderThread.chunkLoaded.connect(self.appendChunk)
+        self.loaderThread.progress.connect(self.onLoadProgress)
+        self.loaderThread.restarted.connect(self.onLoadRestarted)
+        self.loaderThread.loadFinished.connect(self.finishLoad)
+        self.loaderThread.loadFailed.connect(self.onLoadFailed)
+        self.loaderThread.start()
+
+    def useLexer(self, lexer_name):
+        # A lexer picked by class name from LEXER_MAP_MENU, or None for plain text
+        self.editor.setLexer(create_lexer(lexer_name, self.editor) if lexer_name else None)
+        if self.editor.lexer() is not None and self.apiCache:
+            self.apiCache.defaultApisFor(self.editor.lexer())
+        if self.largeFileMode:
+            self.stopFoldLevels(self.editor)
+        self.applyTheme()
+
+    def viewState(self):
+        line, column = self.editor.getCursorPosition()
+        lexer = self.editor.lexer()
+        return {"line": line, "column": column, "first_visible_line": self.editor.firstVisibleLine(),
+                "folds": self.editor.contractedFolds(), "lexer": type(lexer).__name__ if lexer else None}
+
+    def restoreViewState(self, state):
+        # setLexer styles the whole loaded document, a large file keeps the lexer it got while empty
+        if "lexer" in state and not self.largeFileMode:
+            lexer = self.editor.lexer()
+            lexer_name = state["lexer"] if state["lexer"] in LEXER_MAP_MENU.values() else None
+            if lexer_name != (type(lexer).__name__ if lexer else None):
+                self.useLexer(lexer_name)
+        if state.get("folds"):
+            self.editor.setContractedFolds(state["folds"])
+        self.editor.setCursorPosition(state.get("line", 0), state.get("column", 0))
+        self.editor.setFirstVisibleLine(state.get("first_visible_line", 0))
+
+    def beginLoad(self):
+        self.editor.setReadOnly(False)
+        self.editor.clear()
+        # No undo history for the initial content, and no edits to a half loaded file
+        self.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, False)
+        self.editor.setReadOnly(True)
+        if self.largeFileMode:
+            # setLexer styles all the text it is given, so a large file gets its lexer while still empty
+            if self.hasLargeFileLexer():
+                self.setLexerForFile(self.current_file_path)
+            else:
+                self.useLexer(None)
+
+    def isStaleLoaderSignal(self):
+        # Chunks and results a stopped loader had already queued before it was disconnected
+        sender = self.sender()
+        return isinstance(sender, FileLoaderThread) and sender is not self.loaderThread
+
+    def appendChunk(self, chunk):
+        if self.isStaleLoaderSignal():
+            return
+        # Read-only keeps the user out while loading, but also blocks our own appends
+        self.editor.setReadOnly(False)
+        self.editor.SendScintilla(QsciScintilla.SCI_APPENDTEXT, len(chunk), chunk)
+        self.editor.setReadOnly(True)
+        if self.loaderThread is not None and self.sender() is self.loaderThread:
+            self.loaderThread.chunkConsumed()
+
+    def onLoadProgress(self, done, total):
+        if self.isStaleLoaderSignal():
+            return
+        self.loadingProgress.setValue(int(done * 100 / total) if total else 100)
+
+    def onLoadRestarted(self, encoding):
+        if self.isStaleLoaderSignal():
+            return
+        self.editor.setReadOnly(False)
+        self.editor.clear()
+        self.editor.setReadOnly(True)
+        self.loadingLabel.setText(f"Loading {os.path.basename(self.current_file_path)} as {encoding}...")
+
+    def finishLoad(self, encoding, eol):
+        if self.isStaleLoaderSignal():
+            return
+        self.stopLoaderThread()
+        self.fileEncoding = encoding
+        self.editor.setEolMode(EOL_MODES[eol])
+        self.editor.setReadOnly(False)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, True)
+        self.editor.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        self.editor.setModified(False)
+        if self.pendingModified:
+            self.pendingModified = False
+            self.markModified()
+        self.fileLoaded.emit(self.current_file_path)
+
+    def onLoadFailed(self, error):
+        if self.isStaleLoaderSignal():
+            return
+        self.stopLoaderThread()
+        self.editor.setReadOnly(False)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, True)
+        self.loadFailed.emit(error)
+
+    def cancelLoad(self):
+        if self.loaderThread is None:
+            return
+        self.stopLoaderThread()
+        # Never leave a truncated copy around where it could be saved over the original
+        self.editor.setReadOnly(False)
+        self.editor.clear()
+        self.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, True)
+        self.editor.setModified(False)
+        self.loadCancelled.emit()
+
+    def isLoading(self):
+        return self.loaderThread is not None
+
+    def markModified(self):
+        self.waitForSave()  # Edits made while a save holds the document read-only are dropped
+        # QScintilla can only set a save point, not clear one. Put it after an edit, undo
+        # that and make an edit that changes nothing: the save point is then unreachable
+        # and the document stays modified until it is saved, whatever is undone
+        editor = self.editor
+        editor.insertAt(" ", 0, 0)
+        editor.setModified(False)
+        editor.undo()
+        editor.beginUndoAction()
+        editor.insertAt(" ", 0, 0)
+        editor.SendScintilla(QsciScintilla.SCI_DELETERANGE, 0, 1)
+        editor.endUndoAction()
+
+    def canHibernate(self):
+        # Only tabs that can be reloaded from their file, and not while it is read or written
+        return bool(self.current_file_path) and not self.isLoading() and self.saveThread is None \
+            and self.splitEditor is None
+
+    def memoryUsage(self):
+        return document_memory(self.editor)
+
+    def stopLoaderThread(self):
+        self.loadingBar.hide()
+        if self.loaderThread is None:
+            return
+        loaderThread, self.loaderThread = self.loaderThread, None
+        for signal in (loaderThread.chunkLoaded, loaderThread.progress, loaderThread.restarted,
+                       loaderThread.loadFinished, loaderThread.loadFailed):
+            signal.disconnect()
+        loaderThread.cancel()
+        loaderThread.wait()
+        loaderThread.deleteLater()
+
+    def maybeSave(self):
+        if self.isLoading():
+            return True  # Nothing the user could have changed yet
+        self.waitForSave()
+        if self.editor.isModified():
+            response = QMessageBox.question(
+                self, "Save Changes",
+                "The document has been modified.\nDo you want to save your changes?",
+                QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
+            )
+            if response == QMessageBox.StandardButton.Save:
+                success, _ = self.saveFile(blocking=True)
+                return success
+            elif response == QMessageBox.StandardButton.Cancel:
+                return False  # User cancelled the operation
+        return True  # No changes to save or user discarded changes
+
+    def saveFile(self, blocking=False):
+        if self.current_file_path:
+            success = self._saveToFile(self.current_file_path, blocking)
+            return success, self.current_file_path
+        else:
+            return self.saveFileAs(blocking=blocking)  # This should handle new files
+
+    def _saveToFile(self, filePath, blocking=False):
+        """
+        Saves the document bytes straight from Scintilla's buffer, on a worker thread
+        unless blocking. fileSaved is emitted once the file is safely on disk.
+        """
+        if self.isLoading():
+            return False
+        self.waitForSave()
+
+        # The save points into the live buffer, so no edits in any view until the write is done
+        for view in self.views():
+            view.setReadOnly(True)
+        self.saveThread = AtomicSaveThread(filePath, self.editor.documentBuffer(), self.fileEncoding, self)
+        self.saveThread.startTime = time.perf_counter()
+        if blocking:
+            self.saveThread.run()
+            return self.onSaveThreadFinished()
+        self.savingLabel.setText(f"Saving {os.path.basename(filePath)}, editing resumes once it is written...")
+        self.savingLabel.show()
+        self.saveThread.finished.connect(self.onSaveThreadFinished)
+        self.saveThread.start()
+        return True
+
+    def waitForSave(self):
+        if self.saveThread is not None:
+            self.saveThread.wait()
+            self.onSaveThreadFinished()
+
+    def onSaveThreadFinished(self):
+        saveThread, self.saveThread = self.saveThread, None
+        if saveThread is None:
+            return True  # Already handled by waitForSave
+        for view in self.views():
+            view.setReadOnly(False)
+        self.savingLabel.hide()
+        saveThread.deleteLater()
+        PROFILER.record("save", saveThread.startTime, time.perf_counter(), "io", {"path": saveThread.filePath})
+        if saveThread.error:
+            QMessageBox.critical(self, "Error Saving File",
+                                 "An error occurred while saving the file:\n" + saveThread.error)
+            return False
+        self.current_file_path = saveThread.filePath
+        self.editor.setModified(False)
+        self.fileSaved.emit(saveThread.filePath)  # Emit the signal with the file path, it updates the tab title
+        return True
+
+    def saveFileAs(self, filePath=None, blocking=False):
+        if not filePath:
+            filePath, _ = QFileDialog.getSaveFileName(self, "Save File As", self.defaultFolderPath, "All Files (*)")
+        if filePath:
+            return self._saveToFile(filePath, blocking), filePath
+        return False, filePath
+
+
+
+
+
+class TabPlaceholder(QWidget):
+    """
+    Stands in for a tab whose editor has not been built yet, holding only the
+    file path and the view state to restore. EditorWidget swaps in a
+    QScintillaEditorWidget the first time the tab is activated.
+    """
+
+    def __init__(self, filePath, viewState=None, parent=None):
+        super().__init__(parent)
+        self.current_file_path = filePath
+        self.viewState = viewState or {}
+        self.prefetched = None  # (utf8_bytes, encoding, eol, mtime_ns) from DocumentReader
+        self.prefetchRequested = False
+        # Set when an editor was hibernated, see hibernation.py
+        self.mtime_ns = None
+        self.swapPath = None  # Unsaved changes, in UTF-8
+        self.fileEncoding = "utf-8"
+        self.eol = "\n"
+
+    def takeDocument(self):
+        """
+        The document to load into the editor that replaces this placeholder: the
+        unsaved changes from the swap file if there are any, otherwise the
+        prefetched file unless it has changed on disk since it was read. Raises
+        OSError if the swap file cannot be read.
+        """
+        if self.swapPath is not None:
+            return read_swap(self.swapPath), self.fileEncoding, self.eol
+        prefetched, self.prefetched = self.prefetched, None
+        if prefetched is None:
+            return None
+        data, encoding, eol, mtime_ns = prefetched
+        try:
+            if os.stat(self.current_file_path).st_mtime_ns != mtime_ns:
+                return None
+        except OSError:
+            return None
+        return data, encoding, eol
+
+    def memoryUsage(self):
+        return len(self.prefetched[0]) if self.prefetched else 0
+
+    def changedOnDisk(self):
+        # Since the editor was hibernated
+        if self.mtime_ns is None:
+            return False
+        try:
+            return os.stat(self.current_file_path).st_mtime_ns != self.mtime_ns
+        except OSError:
+            return True
+
+    def discardSwap(self):
+        if self.swapPath is not None:
+            remove_swap(self.swapPath)
+            self.swapPath = None
+
+    def maybeSave(self):
+        if self.swapPath is None:
+            return True  # Nothing unsaved
+        response = QMessageBox.question(
+            self, "Save Changes",
+            f"{os.path.basename(self.current_file_path)} has been modified.\nDo you want to save your changes?",
+            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
+        )
+        if response == QMessageBox.StandardButton.Save:
+            try:
+                atomic_write(self.current_file_path, read_swap(self.swapPath), self.fileEncoding)
+            except (OSError, UnicodeError) as e:
+                QMessageBox.critical(self, "Error Saving File", "An error occurred while saving the file:\n" + str(e))
+                return False
+        elif response != QMessageBox.StandardButton.Discard:
+            return False
+        self.discardSwap()
+        return True
+
+    def applyTheme(self, theme=None):
+        pass  # Themed when the editor is built
+
+
+class EditorWidget(QWidget):
+
+    def __init__(self, filePath=None, parent=None, launchTime=None, sessionEnabled=False):
+        super().__init__(parent)
+        self.completionService = CompletionService(self)
+        self.completionService.errorOccurred.connect(self.onErrorOccurred)
+        self.completionService.environmentReady.connect(self.onJediEnvironmentReady)
+        self.apiCache = PreparedApiCache(self)
+        self.documentReader = DocumentReader(self)
+        self.documentReader.documentRead.connect(self.onDocumentPrefetched)
+        settings = load_settings()
+        threshold_mb = settings.get("large_file_threshold_mb")
+        self.largeFileThreshold = int(threshold_mb * 1024 * 1024) if threshold_mb else \
+            QScintillaEditorWidget.LARGE_FILE_THRESHOLD
+        theme_name = settings.get("theme", DEFAULT_THEME)
+        try:
+            THEME_ENGINE.setTheme(theme_name)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load theme %s, using %s: %s", theme_name, DEFAULT_THEME, e)
+        self.setupUi()
+        hibernate_minutes = settings.get("hibernate_after_minutes", HIBERNATE_AFTER_MINUTES)
+        budget_mb = settings.get("memory_budget_mb", 0)
+        self.memoryManager = MemoryBudgetManager(self.tabWidget, self.hibernateTab, int(hibernate_minutes * 60),
+                                                 int(budget_mb * 1024 * 1024), self)
+
+        # Only what is needed to draw the window happens before the first paint,
+        # files, Jedi and the completion APIs follow in finishStartup
+        self.startupFinished = False
+        self.startupFiles = [filePath] if filePath else []
+        self.sessionEnabled = sessionEnabled  # Restore the last session at startup and save this one on close
+        self.firstPaintWatcher = FirstPaintWatcher(self, launchTime, self)
+        self.firstPaintWatcher.painted.connect(self.finishStartup)
+        QTimer.singleShot(FIRST_PAINT_FALLBACK_MS, self.finishStartup)
+
+    def finishStartup(self):
+        if self.startupFinished:
+            return
+        self.startupFinished = True
+        if self.firstPaintWatcher.elapsedMs is not None:  # None when the fallback timer got here first
+            PROFILER.record("first paint", self.firstPaintWatcher.launchTime,
+                            self.firstPaintWatcher.launchTime + self.firstPaintWatcher.elapsedMs / 1000, "startup")
+        self.completionService.warmEnvironment(self.defaultFolderPath())
+        self.apiCache.prewarmBuiltins()
+        remove_stale_swaps()  # Left by an editor that crashed with tabs hibernated
+        if self.sessionEnabled:
+            self.restoreSession()
+        files, self.startupFiles = self.startupFiles, []
+        self.openFiles(files)
+
+    def restoreSession(self):
+        session = load_session()
+        tabs = session.get("tabs", [])
+        current = session.get("current", 0)
+        currentTab = tabs[current] if isinstance(current, int) and 0 <= current < len(tabs) else None
+        tabs = [tab for tab in tabs if os.path.isfile(tab.get("path", ""))]
+        if not tabs:
+            return
+        started = time.perf_counter()
+        with PROFILER.span("restore session", "startup", tabs=len(tabs)):
+            self.tabWidget.blockSignals(True)
+            try:
+                placeholders = [self.addPlaceholderTab(tab["path"], tab.get("view")) for tab in tabs]
+            finally:
+                self.tabWidget.blockSignals(False)
+            active = placeholders[tabs.index(currentTab)] if currentTab in tabs else placeholders[0]
+            # Only the active tab is loaded, the others wait as placeholders until activated.
+            # Its neighbour is read ahead like on any tab switch
+            index = self.tabWidget.indexOf(active)
+            self.materializeTab(index)
+            self.prefetchNeighbour(index)
+        logger.info("Restored %d tabs in %.0f ms", len(tabs), (time.perf_counter() - started) * 1000)
+
+    def saveSession(self):
+        tabs = []
+        current = 0
+        for i in range(self.tabWidget.count()):
+            editorWidget = self.tabWidget.widget(i)
+            if not editorWidget.current_file_path:
+                continue  # Untitled
+            if i == self.tabWidget.currentIndex():
+                current = len(tabs)
+            if isinstance(editorWidget, TabPlaceholder):
+                view = editorWidget.viewState  # Never activated, still as it was restored
+            elif editorWidget.isLoading():
+                view = getattr(editorWidget, "pendingViewState", None) or {}
+            else:
+                view = editorWidget.viewState()
+            tabs.append({"path": editorWidget.current_file_path, "view": view})
+        try:
+            save_session(tabs, current)
+        except OSError as e:
+            logger.warning("Could not save the session: %s", e)
+
+    @profiled("EditorWidget.setupUi", "startup")
+    def setupUi(self):
+        self.layout = QVBoxLayout(self)
+        self.menuBar = QMenuBar()
+        self.layout.setMenuBar(self.menuBar)  # Add the menu bar to the layout
+
+        # File menu
+        fileMenu = self.menuBar.addMenu("&File")
+        newAction = QAction("&New", self)
+        newAction.setShortcut("Ctrl+N")
+
+
+        newAction.triggered.connect(self.newTab)
+        fileMenu.addAction(newAction)
+
+        openAction = QAction("&Open", self)
+        openAction.triggered.connect(self.openFile)
+        fileMenu.addAction(openAction)
+
+        self.recentFilesMenu = QMenu("&Recent Files", self)
+        fileMenu.addMenu(self.recentFilesMenu)
+
+        saveAction = QAction("&Save", self)
+        saveAction.triggered.connect(self.saveFile)
+        fileMenu.addAction(saveAction)
+
+        saveAsAction = QAction("Save &As...", self)
+        saveAsAction.triggered.connect(self.saveFileAs)
+        fileMenu.addAction(saveAsAction)
+
+        closeTabAction = QAction("&Close Tab", self)
+        closeTabAction.setShortcut("Ctrl+W")
+
+
+        closeTabAction.triggered.connect(lambda: self.closeTab(self.tabWidget.currentIndex()))
+        fileMenu.addAction(closeTabAction)
+
+        # Edit menu
+        editMenu = self.menuBar.addMenu("&Edit")
+        searchAction = QAction("&Find", self)
+        searchAction.setShortcut("Ctrl+F")
+        searchAction.triggered.connect(self.search)
+        editMenu.addAction(searchAction)
+
+        replaceAction = QAction("&Replace", self)
+        replaceAction.setShortcut("Ctrl+R")
+        replaceAction.triggered.connect(self.replace)
+        editMenu.addAction(replaceAction)
+
+        replaceAllAction = QAction("Replace &All", self)
+        replaceAllAction.triggered.connect(self.replaceAll)
+        editMenu.addAction(replaceAllAction)
+
+        findInFilesAction = QAction("Find in &Files", self)
+        findInFilesAction.setShortcut("Ctrl+Shift+F")
+        findInFilesAction.triggered.connect(self.showFindInFiles)
+        editMenu.addAction(findInFilesAction)
+
+        replaceInFilesAction = QAction("Replace in Fi&les", self)
+        replaceInFilesAction.setShortcut("Ctrl+Shift+H")
+        replaceInFilesAction.triggered.connect(self.showReplaceInFiles)
+        editMenu.addAction(replaceInFilesAction)
+
+        viewMenu = self.menuBar.addMenu("&View")
+
+        zoomInAction = QAction("Zoom &In", self)
+        zoomInAction.setShortcut("Ctrl++")
+        zoomInAction.triggered.connect(self.zoomIn)
+        viewMenu.addAction(zoomInAction)
+
+        zoomOutAction = QAction("Zoom &Out", self)
+        zoomOutAction.setShortcut("Ctrl+-")
+        zoomOutAction.triggered.connect(self.zoomOut)
+        viewMenu.addAction(zoomOutAction)
+
+        splitSideBySideAction = QAction("Split &Left and Right", self)
+        splitSideBySideAction.triggered.connect(lambda: self.splitCurrentTab(Qt.Orientation.Horizontal))
+        viewMenu.addAction(splitSideBySideAction)
+        splitStackedAction = QAction("Split &Top and Bottom", self)
+        splitStackedAction.triggered.connect(lambda: self.splitCurrentTab(Qt.Orientation.Vertical))
+        viewMenu.addAction(splitStackedAction)
+        unsplitAction = QAction("&Close Split", self)
+        unsplitAction.triggered.connect(self.unsplitCurrentTab)
+        viewMenu.addAction(unsplitAction)
+
+        # Syntax highlighting submenu
+        syntaxMenu = QMenu("Syntax", self)
+        viewMenu.addMenu(syntaxMenu)
+
+        # Populate the syntax menu with lexer options
+        for name, lexer_name in LEXER_MAP_MENU.items():
+            action = QAction(name, self)
+            action.triggered.connect(lambda checked, lx=lexer_name: self.changeLexer(lx))
+            syntaxMenu.addAction(action)
+
+        # Theme files can be added while the editor runs, so the list is read on opening
+        self.themeMenu = QMenu("&Theme", self)
+        self.themeMenu.aboutToShow.connect(self.populateThemeMenu)
+        viewMenu.addMenu(self.themeMenu)
+
+        toolsMenu = self.menuBar.addMenu("&Tools")
+        self.completionServerAction = QAction("Out-of-Process &Completion", self)
+        self.completionServerAction.setCheckable(True)
+        self.completionServerAction.setChecked(load_settings().get("completion_server", False))
+        self.completionServerAction.toggled.connect(self.toggleCompletionServer)
+        toolsMenu.addAction(self.completionServerAction)
+        completionStatsAction = QAction("Completion &Statistics", self)
+        completionStatsAction.triggered.connect(self.showCompletionStats)
+        toolsMenu.addAction(completionStatsAction)
+        self.completionService.setUseCompletionServer(self.completionServerAction.isChecked())
+
+        toolsMenu.addSeparator()
+        self.profilingAction = QAction("&Profiling", self)
+        self.profilingAction.setCheckable(True)
+        self.profilingAction.setChecked(PROFILER.enabled)
+        self.profilingAction.toggled.connect(PROFILER.setEnabled)
+        toolsMenu.addAction(self.profilingAction)
+        latencyAction = QAction("&Latency Histograms", self)
+        latencyAction.triggered.connect(self.showLatencyHistograms)
+        toolsMenu.addAction(latencyAction)
+        exportProfileAction = QAction("&Export Profile...", self)
+        exportProfileAction.triggered.connect(self.exportProfile)
+        toolsMenu.addAction(exportProfileAction)
+        tabMemoryAction = QAction("Tab &Memory", self)
+        tabMemoryAction.triggered.connect(self.showTabMemory)
+        toolsMenu.addAction(tabMemoryAction)
+
+        helpMenu = self.menuBar.addMenu("&Help")
+        aboutAction = QAction("&About", self)
+        aboutAction.triggered.connect(self.showAboutDialog)
+        helpMenu.addAction(aboutAction)
+        hotkeysAction = QAction("&Hotkeys", self)
+        hotkeysAction.triggered.connect(self.showHotkeysDialog)
+        helpMenu.addAction(hotkeysAction)
+
+        self.tabWidget = QTabWidget()
+        self.tabWidget.setTabsClosable(True)
+        self.tabWidget.tabCloseRequested.connect(self.closeTab)
+        self.tabWidget.currentChanged.connect(self.onCurrentTabChanged)
+
+        # Find in Files results sit under the tabs, hidden until used
+        self.findInFilesPanel = FindInFilesPanel(self, openEditors=self.openEditors)
+        self.findInFilesPanel.openRequested.connect(self.openFileAt)
+        self.findInFilesPanel.hide()
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.splitter.addWidget(self.tabWidget)
+        self.splitter.addWidget(self.findInFilesPanel)
+        self.splitter.setStretchFactor(0, 3)
+        self.splitter.setStretchFactor(1, 1)
+        self.layout.addWidget(self.splitter)
+        self.newTab()
+
+        # Context menu actions
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.ActionsContextMenu)
+
+        newAction = QAction("&New", self)
+        newAction.triggered.connect(self.newTab)
+        self.addAction(newAction)
+
+        openAction = QAction("&Open", self)
+        openAction.triggered.connect(self.openFile)
+        self.addAction(openAction)
+
+        saveAction = QAction("&Save", self)
+        saveAction.triggered.connect(self.saveFile)
+        self.addAction(saveAction)
+
+        saveAsAction = QAction("Save &As...", self)
+        saveAsAction.triggered.connect(self.saveFileAs)
+        self.addAction(saveAsAction)
+
+        closeTabAction = QAction("&Close Tab", self)
+        closeTabAction.triggered.connect(lambda: self.closeTab(self.tabWidget.currentIndex()))
+        self.addAction(closeTabAction)
+        self.populateRecentFilesMenu()
+
+    def populateRecentFilesMenu(self):
+        self.recentFilesMenu.clear()
+        recent_files = load_recent_files()
+        for filePath in recent_files:
+            action = QAction(os.path.basename(filePath), self)
+            action.triggered.connect(lambda checked, path=filePath: self.openFileAtPath(path))
+            self.recentFilesMenu.addAction(action)
+
+    def populateThemeMenu(self):
+        self.themeMenu.clear()
+        current = THEME_ENGINE.current().name
+        for name in THEME_ENGINE.available():
+            action = QAction(name, self.themeMenu)
+            action.setCheckable(True)
+            action.setChecked(name == current)
+            action.triggered.connect(lambda checked, name=name: self.setTheme(name))
+            self.themeMenu.addAction(action)
+
+    def setTheme(self, name):
+        try:
+            theme = THEME_ENGINE.setTheme(name)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Theme", f"Could not load theme {name}:\n{e}")
+            return
+        # One pass over every tab with painting suspended, the window repaints once at the end
+        self.setUpdatesEnabled(False)
+        try:
+            for i in range(self.tabWidget.count()):
+                self.tabWidget.widget(i).applyTheme(theme)
+        finally:
+            self.setUpdatesEnabled(True)
+        save_settings({"theme": name})
+
+    def changeLexer(self, lexer_name):
+        current_editor_widget = self.getCurrentEditorWidget()
+        if current_editor_widget:
+            if current_editor_widget.largeFileMode and QMessageBox.question(
+                    self, "Change Lexer",
+                    "This is a large file, the new lexer highlights all of it at once and that can take a while. "
+                    "Change the lexer?") != QMessageBox.StandardButton.Yes:
+                return
+            current_editor_widget.useLexer(lexer_name)
+
+    def splitCurrentTab(self, orientation):
+        editorWidget = self.getCurrentEditorWidget()
+        if editorWidget and not editorWidget.splitView(orientation):
+            QMessageBox.information(self, "Split View", "The file is still loading, split it once it is open.")
+
+    def unsplitCurrentTab(self):
+        editorWidget = self.getCurrentEditorWidget()
+        if editorWidget:
+            editorWidget.unsplitView()
+
+    def toggleCompletionServer(self, enabled):
+        self.completionService.setUseCompletionServer(enabled)
+        save_settings({"completion_server": enabled})
+
+    def showCompletionStats(self):
+        session_stats = self.completionService.sessionStats()
+        lines = [f"Jedi requests: {session_stats['jedi_requests']}, "
+                 f"served from cached candidates: {session_stats['filtered_refinements']}"]
+        for source, stats in self.completionService.preloadStats().items():
+            lines.append(f"{source}:")
+            lines.append(f"  Preload registry hits: {stats['hits']}, misses: {stats['misses']}")
+            lines.append(f"  Modules preloaded: {stats['preloaded']} ({stats['pending']} pending, "
+                         f"{stats['preload_errors']} failed)")
+            lines.append(f"  Total preload time: {stats['preload_time']:.2f}s")
+        QMessageBox.information(self, "Completion Statistics", "\n".join(lines))
+
+    def showLatencyHistograms(self):
+        summary = PROFILER.histogramSummary()
+        if not summary:
+            text = "No latencies recorded yet." if PROFILER.enabled else "Turn on Tools > Profiling to record latencies."
+        else:
+            text = "\n".join(f"{name}:\n  {line}" for name, line in summary.items())
+        QMessageBox.information(self, "Latency Histograms", text)
+
+    def exportProfile(self):
+        filePath, selectedFilter = QFileDialog.getSaveFileName(
+            self, "Export Profile", "pyeasyedit-profile.trace.json",
+            "Chrome trace (*.trace.json);;JSON (*.json)")
+        if not filePath:
+            return
+        try:
+            PROFILER.export(filePath, chrome=selectedFilter.startswith("Chrome"))
+        except OSError as e:
+            QMessageBox.critical(self, "Error Exporting Profile", f"Could not write {filePath}:\n{e}")
+
+    def showTabMemory(self):
+        rows = []
+        for i in range(self.tabWidget.count()):
+            widget = self.tabWidget.widget(i)
+            if isinstance(widget, TabPlaceholder):
+                state = "unsaved changes in swap file" if widget.swapPath else \
+                    "prefetched" if widget.prefetched else "not loaded"
+            else:
+                state = "modified" if widget.editor.isModified() else "loaded"
+            rows.append((widget.memoryUsage(), self.tabWidget.tabText(i), state))
+        rows.sort(reverse=True)
+        lines = [f"{name}: {usage / (1024 * 1024):.1f} MB ({state})" for usage, name, state in rows]
+        lines.append(f"Total: {sum(row[0] for row in rows) / (1024 * 1024):.1f} MB, estimated from document sizes")
+        QMessageBox.information(self, "Tab Memory", "\n".join(lines))
+
+    def showHotkeysDialog(self):
+        dialog = HotkeysDialog(self)
+        dialog.exec()
+
+    def zoomIn(self):
+        current_editor = self.getCurrentEditor()
+        if current_editor:
+            current_editor.zoomIn()
+
+    def zoomOut(self):
+        current_editor = self.getCurrentEditor()
+        if current_editor:
+            current_editor.zoomOut()
+
+    def createEditorWidget(self):
+        editorWidget = QScintillaEditorWidget(self.defaultFolderPath(), apiCache=self.apiCache)
+        editorWidget.fileSaved.connect(self.updateTabText)  # This connection should handle both Save and Save As
+        editorWidget.fileSaved.connect(self.updateRecentFiles)  # Once the file is on disk, saves run in the background
+        editorWidget.largeFileThreshold = self.largeFileThreshold
+        editorWidget.largeFileModeChanged.connect(self.onLargeFileModeChanged)
+
+        editor = editorWidget.editor
+        editor.AContainer = editorWidget  # backlink
+        # Editor setup (auto-completion, auto-indent, etc.)
+        editor.setAutoCompletionSource(QsciScintilla.AutoCompletionSource.AcsAll)
+        editor.setAutoCompletionThreshold(1)  # Start autocompletion after 1 character
+        editor.setAutoIndent(True)
+        editor.setIndentationWidth(4)
+        editor.setIndentationsUseTabs(False)
+        return editorWidget
+
+    def newTab(self, filePath=None):
+        editorWidget = self.createEditorWidget()
+        tabIndex = self.tabWidget.addTab(editorWidget, "Untitled")
+        self.tabWidget.setCurrentIndex(tabIndex)
+        if filePath:
+            self.loadFileIntoEditor(filePath, editorWidget)
+
+    def setupJedi(self, editorWidget):
+        editor = editorWidget.editor
+        filePath = editorWidget.current_file_path
+        # Large files never get Jedi unless the user overrides large file mode
+        if editor.completionService or editorWidget.largeFileMode or not (filePath and filePath.endswith(".py")):
+            return
+        environment = JEDI_ENVIRONMENTS.cachedEnvironment()
+        if environment is None:
+            # Creating the environment imports Jedi and runs the interpreter, don't
+            # wait for it here, onJediEnvironmentReady comes back to this tab
+            editorWidget.jediPending = True
+            self.completionService.warmEnvironment(self.defaultFolderPath())
+            return
+        editorWidget.jediPending = False
+        editor.jedi_environment = environment
+        editor.jedi_project = JEDI_ENVIRONMENTS.project(self.defaultFolderPath())
+        self.completionService.attach(editor)
+        editor.textChanged.connect(lambda: self.handle_text_changed(editor))
+
+    def onJediEnvironmentReady(self):
+        for i in range(self.tabWidget.count()):
+            editorWidget = self.tabWidget.widget(i)
+            if getattr(editorWidget, "jediPending", False):
+                self.setupJedi(editorWidget)
+
+    def onLargeFileModeChanged(self, enabled):
+        editorWidget = self.sender()
+        if not enabled:
+            self.setupJedi(editorWidget)
+            self.handle_text_changed(editorWidget.editor)
+
+    @profiled("handle_text_changed")
+    def handle_text_changed(self, editor):
+        # Check if the Jedi environment is configured
+        if not hasattr(editor, 'jedi_environment') or editor.jedi_environment is None:
+            return  # Early exit if Jedi not configured
+
+        # Edits in a split view reach the editor too, only complete where the user types
+        splitEditor = editor.AContainer.splitEditor
+        if splitEditor is not None and splitEditor.hasFocus():
+            return
+
+        # Only bookkeeping happens on the UI thread, Jedi runs once typing pauses
+        self.completionService.documentChanged(editor)
+
+    def onErrorOccurred(self, error):
+        logger.warning("%s", error)
+
+    def updateTabText(self, filePath):
+        editorWidget = self.sender()
+        if editorWidget:
+            index = self.tabWidget.indexOf(editorWidget)
+            if index != -1:
+                self.tabWidget.setTabText(index, os.path.basename(filePath))
+
+    def openFile(self):
+        filePath, _ = QFileDialog.getOpenFileName(self, "Open File", self.defaultFolderPath(), "All Files (*)")
+        if filePath:
+            self.openPath(filePath)
+
+    def openPath(self, filePath):
+        # Check if the file is already open
+        editorWidget = self.findTabForPath(filePath)
+        if editorWidget is not None:
+            self.tabWidget.setCurrentWidget(editorWidget)
+            return
+        # Load the file into a new tab
+        self.loadFileIntoEditor(filePath)
+        self.updateRecentFiles(filePath)  # Update the list of recent files
+
+    def openFiles(self, filePaths):
+        # Files from the command line, or forwarded by a second launch. Each gets a
+        # placeholder tab, only the one left active is loaded now
+        if not self.startupFinished:
+            self.startupFiles.extend(filePaths)
+            return
+        lastTab = None
+        added = []
+        self.tabWidget.blockSignals(True)
+        try:
+            for filePath in filePaths:
+                if not os.path.isfile(filePath):
+                    continue
+                lastTab = self.findTabForPath(filePath)
+                if lastTab is None:
+                    lastTab = self.addPlaceholderTab(filePath)
+                    added.append(filePath)
+        finally:
+            self.tabWidget.blockSignals(False)
+        if added:
+            self.addRecentFiles(added)
+        if lastTab is not None:
+            self.tabWidget.setCurrentWidget(lastTab)
+            self.onCurrentTabChanged(self.tabWidget.currentIndex())
+        # A second launch with no files still means the user wants this window
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def addPlaceholderTab(self, filePath, viewState=None, index=-1):
+        placeholder = TabPlaceholder(filePath, viewState)
+        self.tabWidget.insertTab(index, placeholder, os.path.basename(filePath))
+        return placeholder
+
+    def onCurrentTabChanged(self, index):
+        if index == -1:
+            return
+        if isinstance(self.tabWidget.widget(index), TabPlaceholder):
+            self.materializeTab(index)
+        self.prefetchNeighbour(index)
+
+    def materializeTab(self, index):
+        """
+        Replaces the placeholder at index with a real editor, loads its file and
+        restores its view state. Returns the new editor widget.
+        """
+        placeholder = self.tabWidget.widget(index)
+        editorWidget = self.createEditorWidget()
+        editorWidget.filePath = placeholder.current_file_path
+        editorWidget.pendingViewState = placeholder.viewState
+        self.tabWidget.blockSignals(True)
+        try:
+            self.tabWidget.insertTab(index, editorWidget, self.tabWidget.tabText(index))
+            self.tabWidget.removeTab(index + 1)
+            self.tabWidget.setCurrentIndex(index)
+        finally:
+            self.tabWidget.blockSignals(False)
+        placeholder.deleteLater()
+        try:
+            document = placeholder.takeDocument()
+        except OSError as e:
+            document = None
+            QMessageBox.warning(self, "Unsaved Changes Lost",
+                                f"The unsaved changes to {placeholder.current_file_path} could not be read back:\n{e}")
+        editorWidget.pendingModified = placeholder.swapPath is not None and document is not None
+        with PROFILER.span("materialize tab", "io", path=placeholder.current_file_path):
+            self.loadFileIntoEditor(placeholder.current_file_path, editorWidget, document)
+        if placeholder.swapPath is not None:
+            if document is not None:
+                if placeholder.changedOnDisk():
+                    QMessageBox.warning(self, "File Changed",
+                                        f"{placeholder.current_file_path} changed on disk while its tab was "
+                                        "hibernated.\nYour unsaved changes were kept, saving will overwrite it.")
+            placeholder.discardSwap()
+        return editorWidget
+
+    def hibernateTab(self, index):
+        """
+        Replaces the editor at index with a placeholder, releasing its document,
+        lexer and undo history; the tab reloads when activated. Unsaved changes
+        are spilled to a swap file first. Returns False if the tab was left as is.
+        """
+        editorWidget = self.tabWidget.widget(index)
+        if self.hasOpenDialog(editorWidget):
+            return False
+        filePath = editorWidget.current_file_path
+        placeholder = TabPlaceholder(filePath, editorWidget.viewState())
+        try:
+            placeholder.mtime_ns = os.stat(filePath).st_mtime_ns
+        except OSError:
+            if not editorWidget.editor.isModified():
+                return False  # Could not be reloaded, keep it in memory
+        if editorWidget.editor.isModified():
+            try:
+                placeholder.swapPath = write_swap(filePath, editorWidget.editor.documentBuffer())
+            except OSError as e:
+                logger.warning("Not hibernating %s, could not write a swap file: %s", filePath, e)
+                return False
+            placeholder.fileEncoding = editorWidget.fileEncoding
+            placeholder.eol = next(eol for eol, mode in EOL_MODES.items() if mode == editorWidget.editor.eolMode())
+        self.tabWidget.blockSignals(True)
+        try:
+            self.tabWidget.insertTab(index, placeholder, self.tabWidget.tabText(index))
+            self.tabWidget.removeTab(index + 1)
+        finally:
+            self.tabWidget.blockSignals(False)
+        self.completionService.detach(editorWidget.editor)
+        editorWidget.deleteLater()
+        logger.debug("Hibernated %s", filePath)
+        return True
+
+    def hasOpenDialog(self, editorWidget):
+        # Search and Replace keep using the view they were opened on until they are closed
+        views = editorWidget.views()
+        return any(dialog is not None and dialog.isVisible() and dialog.editor in views
+                   for dialog in (getattr(self, "searchDialog", None), getattr(self, "replaceDialog", None)))
+
+    def prefetchNeighbour(self, index):
+        # The tab to the right is the likeliest next one (the left one at the end of the row),
+        # read and decode it in the background so switching to it only builds the editor
+        target = None
+        for neighbour in (index + 1, index - 1):
+            if isinstance(self.tabWidget.widget(neighbour), TabPlaceholder):
+                target = self.tabWidget.widget(neighbour)
+                break
+        for i in range(self.tabWidget.count()):
+            placeholder = self.tabWidget.widget(i)
+            if placeholder is target:
+                if not placeholder.prefetchRequested:
+                    placeholder.prefetchRequested = self.documentReader.read(placeholder.current_file_path)
+            elif isinstance(placeholder, TabPlaceholder) and placeholder.prefetchRequested:
+                # The memory budget can't hibernate prefetched text, keep only the neighbour's
+                placeholder.prefetchRequested = False
+                placeholder.prefetched = None
+
+    def onDocumentPrefetched(self, filePath, document):
+        placeholder = self.findTabForPath(filePath)
+        if isinstance(placeholder, TabPlaceholder) and placeholder.prefetchRequested:
+            placeholder.prefetched = document  # Dropped if the tab was built or moved away from meanwhile
+
+    def findTabForPath(self, filePath):
+        filePath = os.path.normcase(os.path.abspath(filePath))
+        for i in range(self.tabWidget.count()):
+            editorWidget = self.tabWidget.widget(i)
+            current = editorWidget.current_file_path
+            if current and os.path.normcase(os.path.abspath(current)) == filePath:
+                return editorWidget
+        return None
+
+    def openEditors(self):
+        # Editors of the open tabs by normalized path, for Replace in Files, None where the text is
+        # neither in an editor nor on disk. A save in progress is waited for, it keeps the document
+        # read-only and would drop the replacements
+        editors = {}
+        for i in range(self.tabWidget.count()):
+            editorWidget = self.tabWidget.widget(i)
+            if not editorWidget.current_file_path:
+                continue
+            key = os.path.normcase(os.path.abspath(editorWidget.current_file_path))
+            if isinstance(editorWidget, TabPlaceholder):
+                if editorWidget.swapPath is not None:
+                    editors[key] = None  # Its unsaved changes would replace whatever is written to disk
+                continue  # Otherwise not loaded yet, Replace in Files works on the file on disk
+            if editorWidget.isLoading():
+                editors[key] = None
+                continue
+            editorWidget.waitForSave()
+            editors[key] = editorWidget.editor
+        return editors
+
+    def openFileAt(self, filePath, line, column):
+        editorWidget = self.findTabForPath(filePath)
+        if editorWidget is None:
+            self.loadFileIntoEditor(filePath)
+            editorWidget = self.findTabForPath(filePath)
+            if editorWidget is None:
+                return  # Failed to open, the tab is already gone
+            self.updateRecentFiles(filePath)
+        self.tabWidget.setCurrentWidget(editorWidget)
+        editorWidget = self.tabWidget.currentWidget()  # Activating a placeholder tab replaces it
+        if editorWidget.isLoading():
+            editorWidget.pendingCursor = (line, column)  # Applied in onFileLoaded
+        else:
+            self.moveCursorTo(editorWidget, line, column)
+
+    def moveCursorTo(self, editorWidget, line, column):
+        editor = editorWidget.editor
+        editor.setCursorPosition(line, column)
+        editor.ensureLineVisible(line)
+        editor.setFocus()
+
+    def showFindInFiles(self):
+        self.findInFilesPanel.setRootPath(self.defaultFolderPath())
+        self.findInFilesPanel.show()
+        self.findInFilesPanel.searchField.setFocus()
+        self.findInFilesPanel.searchField.selectAll()
+
+    def showReplaceInFiles(self):
+        self.showFindInFiles()
+        if self.findInFilesPanel.searchField.text():
+            self.findInFilesPanel.replaceField.setFocus()
+
+    def defaultFolderPath(self):
+        # Ensure the ./devops directory exists or create it
+        basePath = os.getcwd()  # Get the current working directory
+        devopsPath = os.path.join(basePath, "devops")
+        if not os.path.exists(devopsPath):
+            os.makedirs(devopsPath)
+        return devopsPath
+    @profiled("loadFileIntoEditor", "io")
+    def loadFileIntoEditor(self, filePath, editorWidget=None, document=None):
+        if not editorWidget:
+            editorWidget = self.createEditorWidget()
+            editorWidget.filePath = filePath
+            tabIndex = self.tabWidget.addTab(editorWidget, os.path.basename(filePath))
+            self.tabWidget.setCurrentIndex(tabIndex)
+
+        # Loading may finish later on a worker thread, the rest happens in onFileLoaded
+        editorWidget.fileLoaded.connect(self.onFileLoaded)
+        editorWidget.loadCancelled.connect(self.onLoadCancelled)
+        editorWidget.loadFailed.connect(self.onLoadFailed)
+        self.tabWidget.setTabText(self.tabWidget.indexOf(editorWidget), os.path.basename(filePath))
+        editorWidget.loadStartTime = time.perf_counter()
+        editorWidget.loadFile(filePath, document)
+
+    def onFileLoaded(self, filePath):
+        editorWidget = self.sender()
+        # Covers streamed loads too, which finish long after loadFileIntoEditor returned
+        PROFILER.record("file load", editorWidget.loadStartTime, time.perf_counter(), "io", {"path": filePath})
+        if not editorWidget.largeFileMode:
+            editorWidget.setLexerForFile(filePath)  # A large file got its lexer before loading
+        self.setupJedi(editorWidget)
+        self.handle_text_changed(editorWidget.editor)
+        if getattr(editorWidget, "pendingViewState", None):
+            editorWidget.restoreViewState(editorWidget.pendingViewState)
+            editorWidget.pendingViewState = None
+        if getattr(editorWidget, "pendingCursor", None):
+            self.moveCursorTo(editorWidget, *editorWidget.pendingCursor)
+            editorWidget.pendingCursor = None
+
+    def onLoadCancelled(self):
+        index = self.tabWidget.indexOf(self.sender())
+        if index != -1:
+            self.closeTab(index)
+
+    def onLoadFailed(self, error):
+        editorWidget = self.sender()
+        QMessageBox.critical(self, "Error Opening File", "An error occurred while opening the file:\n" + error)
+        index = self.tabWidget.indexOf(editorWidget)
+        if index != -1:
+            editorWidget.editor.setModified(False)
+            self.closeTab(index)
+
+    def saveFile(self):
+        editorWidget = self.getCurrentEditorWidget()  # Ensure you are retrieving the editor widget
+        if editorWidget:
+            editorWidget.saveFile()  # The recent files list is updated on fileSaved
+
+    def getCurrentEditorWidget(self):
+        """
+        Returns the QScintillaEditorWidget instance of the currently active tab.
+        """
+        # Access the currently active tab using the currentWidget method of QTabWidget
+        currentEditor = self.tabWidget.currentWidget()
+        return currentEditor
+
+    def saveFileAs(self):
+        try:
+            editorWidget = self.getCurrentEditorWidget()
+            if editorWidget:
+                success, filePath = editorWidget.saveFileAs()  # Adjusted to capture return values
+                if success and filePath:
+                    # Update the tab title
+                    filename = os.path.basename(filePath)
+                    tabIndex = self.tabWidget.currentIndex()
+                    self.tabWidget.setTabText(tabIndex, filename)
+
+                    return True
+        except Exception:
+            logger.exception("Save As failed")
+        return False
+
+
+        # self.recentFilesMenu.clear()
+        # recent_files = load_recent_files()  # Load recent files from registry
+        # for filePath in recent_files:
+        #     action = self.recentFilesMenu.addAction(os.path.basename(filePath))
+        #     action.triggered.connect(lambda checked, path=filePath: self.openFileAtPath(path))
+
+    def openFileAtPath(self, filePath):
+        self.loadFileIntoEditor(filePath)
+
+    def updateRecentFiles(self, filePath, remove=False):
+        recent_files = load_recent_files()
+        if remove and filePath in recent_files:
+            recent_files.remove(filePath)
+        elif filePath not in recent_files:
+            recent_files.insert(0, filePath)
+            recent_files = recent_files[:10]
+        save_recent_files(recent_files)
+        self.populateRecentFilesMenu()
+
+    def addRecentFiles(self, filePaths):
+        # One settings write for a batch of files, the last one opened first
+        recent_files = load_recent_files()
+        for filePath in filePaths:
+            if filePath not in recent_files:
+                recent_files.insert(0, filePath)
+        save_recent_files(recent_files[:10])
+        self.populateRecentFilesMenu()
+
+    def closeTab(self, index):
+        editorWidget = self.tabWidget.widget(index)
+        if isinstance(editorWidget, TabPlaceholder):
+            if editorWidget.maybeSave():
+                self.tabWidget.removeTab(index)
+                editorWidget.deleteLater()
+            return
+        if editorWidget and editorWidget.maybeSave():
+            editorWidget.stopLoaderThread()
+            # Consider removing the file path from recent files if necessary
+            recent_files = load_recent_files()
+            if editorWidget.current_file_path in recent_files:
+                # recent_files.remove(editorWidget.current_file_path)
+                save_recent_files(recent_files)
+            self.completionService.detach(editorWidget.editor)
+            views = editorWidget.views()
+            for dialog in (getattr(self, "searchDialog", None), getattr(self, "replaceDialog", None)):
+                if dialog is not None and dialog.editor in views:
+                    dialog.close()  # Its editor is about to be deleted
+            self.tabWidget.removeTab(index)
+            editorWidget.deleteLater()
+
+    def maybeSave(self):
+        for i in range(self.tabWidget.count()):
+            editorWidget = self.tabWidget.widget(i)
+            if editorWidget and not editorWidget.maybeSave():
+                return False
+        return True
+
+    def closeEvent(self, event):
+        if self.maybeSave():
+            if self.sessionEnabled:
+                self.saveSession()
+            self.completionService.shutdown()
+            self.documentReader.shutdown()
+            self.findInFilesPanel.shutdown()
+            release_swap_directory()
+            event.accept()
+        else:
+            event.ignore()
+
+    def search(self):
+        current_editor = self.getCurrentEditor()
+        if current_editor:
+            self.searchDialog = SearchDialog(current_editor, self)
+            self.searchDialog.show()
+
+    def replace(self):
+        current_editor = self.getCurrentEditor()
+        if current_editor:
+            self.replaceDialog = ReplaceDialog(current_editor, self)
+            self.replaceDialog.show()
+
+    def replaceAll(self):
+        current_editor = self.getCurrentEditor()
+        if current_editor:
+            find_text, ok = QInputDialog.getText(self, "Find All Text",
+                                                 "Enter the text to find and replace all occurrences:")
+            if ok and find_text:
+                replace_text, ok = QInputDialog.getText(self, "Replace With", "Enter the replacement text:")
+                if ok:
+                    count = replace_all(current_editor, find_text, replace_text)
+                    QMessageBox.information(self, "Replace All", f"Replaced {count} occurrence(s).")
+
+    def getCurrentEditor(self):
+        return self.tabWidget.currentWidget().activeView() if self.tabWidget.currentWidget() else None
+
+    def showAboutDialog(self):
+        dialog = AboutDialog(self)
+        dialog.show()
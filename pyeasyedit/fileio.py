@@ -0,0 +1,267 @@
+import codecs
+import locale
+import os
+import shutil
+import tempfile
+
+from PyQt6.QtCore import QObject, QRunnable, QSemaphore, QThread, QThreadPool, pyqtSignal
+from PyQt6.Qsci import QsciScintilla
+
+from pyeasyedit.profiling import PROFILER
+
+UTF8_BOM = codecs.BOM_UTF8
+EOL_MODES = {
+    "\r\n": QsciScintilla.EolMode.EolWindows,
+    "\r": QsciScintilla.EolMode.EolMac,
+    "\n": QsciScintilla.EolMode.EolUnix,
+}
+
+
+def process_umask():
+    # The umask can only be read by setting it, so this runs once at import, before any save thread
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = process_umask()
+
+
+def candidate_encodings():
+    # Same fallbacks open(..., 'r') would have given us, ending with one that can't fail
+    encodings = []
+    for encoding in ("utf-8", locale.getpreferredencoding(False), "latin-1"):
+        try:
+            encoding = codecs.lookup(encoding).name
+        except LookupError:
+            continue
+        if encoding not in encodings:
+            encodings.append(encoding)
+    return encodings
+
+
+def detect_eol(sample):
+    if b"\r\n" in sample:
+        return "\r\n"
+    if b"\r" in sample and b"\n" not in sample:
+        return "\r"
+    return "\n"
+
+
+def decode_to_utf8(data, encoding, decoder, final=False):
+    """
+    Returns data as UTF-8 bytes for Scintilla. UTF-8 input is only validated, so it
+    is passed through without a decode/encode round trip.
+    """
+    text = decoder.decode(data, final)
+    if encoding in ("utf-8", "utf-8-sig"):
+        return data
+    return text.encode("utf-8")
+
+
+def atomic_write(filePath, data, encoding="utf-8", chunkSize=1 << 20):
+    """
+    Writes UTF-8 data to filePath in the given encoding via a temp file in the same
+    directory, fsyncs it and renames it over the original, so a crash part way
+    through never leaves a truncated file behind. A symlink is followed, so the
+    link stays and the file it points to is replaced.
+    """
+    filePath = os.path.realpath(filePath)
+    directory = os.path.dirname(filePath)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(filePath) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            if encoding in ("utf-8", "utf-8-sig"):
+                if encoding == "utf-8-sig":
+                    file.write(UTF8_BOM)
+                for start in range(0, len(data), chunkSize):
+                    file.write(data[start:start + chunkSize])
+            else:
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                encoder = codecs.getincrementalencoder(encoding)()
+                for start in range(0, len(data), chunkSize):
+                    file.write(encoder.encode(decoder.decode(data[start:start + chunkSize])))
+                file.write(encoder.encode(decoder.decode(b"", True), True))
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(filePath):
+            shutil.copymode(filePath, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~UMASK)  # mkstemp makes it 0600, a new file gets the usual mode
+        os.replace(temp_path, filePath)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_document(filePath):
+    """
+    Reads a small file in one go. Returns (utf8_bytes, encoding, eol).
+    """
+    with open(filePath, "rb") as file:
+        data = file.read()
+    eol = detect_eol(data[:65536])
+    for encoding in candidate_encodings():
+        payload = data
+        if encoding == "utf-8" and data.startswith(UTF8_BOM):
+            encoding, payload = "utf-8-sig", data[len(UTF8_BOM):]
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            return decode_to_utf8(payload, encoding, decoder, final=True), encoding, eol
+        except (UnicodeDecodeError, LookupError):
+            continue
+    raise ValueError(f"Unable to decode {filePath}")
+
+
+class DocumentReadTask(QRunnable):
+    def __init__(self, filePath, reader):
+        super().__init__()
+        self.filePath = filePath
+        self.reader = reader
+
+    def run(self):
+        result = None
+        try:
+            with PROFILER.span("read_document", "io", path=self.filePath):
+                mtime_ns = os.stat(self.filePath).st_mtime_ns
+                data, encoding, eol = read_document(self.filePath)
+                result = (data, encoding, eol, mtime_ns)
+        except (OSError, ValueError):
+            pass  # The tab reports the error itself when it loads the file
+        self.reader.documentRead.emit(self.filePath, result)
+
+
+class DocumentReader(QObject):
+    """
+    Reads and decodes small files with read_document on a thread pool, ahead of
+    the tabs that will show them. Files bigger than FileLoaderThread.CHUNK_SIZE
+    are skipped, those stream in when their tab loads.
+    """
+    documentRead = pyqtSignal(str, object)  # Path, (utf8_bytes, encoding, eol, mtime_ns) or None on failure
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.threadPool = QThreadPool(self)
+
+    def read(self, filePath):
+        try:
+            if os.path.getsize(filePath) > FileLoaderThread.CHUNK_SIZE:
+                return False
+        except OSError:
+            return False
+        self.threadPool.start(DocumentReadTask(filePath, self))
+        return True
+
+    def shutdown(self):
+        self.threadPool.clear()
+        self.threadPool.waitForDone()
+
+
+class FileLoaderThread(QThread):
+    """
+    Reads and decodes a file in bounded chunks off the UI thread. At most
+    MAX_IN_FLIGHT chunks are queued for the UI at once, the reader blocks until
+    the editor reports a chunk appended, so memory stays near one copy of the file.
+    """
+    chunkLoaded = pyqtSignal(bytes)
+    progress = pyqtSignal(int, int)  # Bytes read, total bytes
+    restarted = pyqtSignal(str)  # Earlier chunks were not valid in the guessed encoding
+    loadFinished = pyqtSignal(str, str)  # Encoding, end of line sequence
+    loadFailed = pyqtSignal(str)
+
+    CHUNK_SIZE = 1 << 20
+    MAX_IN_FLIGHT = 4
+
+    def __init__(self, filePath, parent=None):
+        super().__init__(parent)
+        self.filePath = filePath
+        self.slots = QSemaphore(self.MAX_IN_FLIGHT)
+        self.cancelled = False
+
+    def chunkConsumed(self):
+        self.slots.release()
+
+    def cancel(self):
+        self.cancelled = True
+        self.slots.release(self.MAX_IN_FLIGHT)  # Unblock a reader waiting on the UI
+
+    def run(self):
+        try:
+            total = os.path.getsize(self.filePath)
+            encodings = candidate_encodings()
+            for attempt, encoding in enumerate(encodings):
+                if attempt:
+                    self.restarted.emit(encoding)
+                try:
+                    eol = self.stream(encoding, total)
+                except UnicodeDecodeError:
+                    continue
+                if not self.cancelled:
+                    self.loadFinished.emit(self.encoding, eol)
+                return
+        except Exception as e:
+            self.loadFailed.emit(str(e))
+
+    def stream(self, encoding, total):
+        eol = None
+        with open(self.filePath, "rb") as file:
+            head = file.read(len(UTF8_BOM))
+            done = len(head)
+            if encoding == "utf-8" and head == UTF8_BOM:
+                encoding = "utf-8-sig"
+                head = b""
+            decoder = codecs.getincrementaldecoder(encoding)()
+            pending = head
+
+            while not self.cancelled:
+                data = file.read(self.CHUNK_SIZE)
+                final = not data
+                chunk = decode_to_utf8(pending + data, encoding, decoder, final)
+                pending = b""
+                if eol is None:
+                    eol = detect_eol(chunk[:65536])
+                if chunk:
+                    self.slots.acquire()
+                    if self.cancelled:
+                        break
+                    self.chunkLoaded.emit(chunk)
+                done += len(data)
+                self.progress.emit(min(done, total), total)
+                if final:
+                    break
+        self.encoding = encoding
+        return eol or "\n"
+
+
+class AtomicSaveThread(QThread):
+    """
+    Writes a document buffer to disk with atomic_write off the UI thread. The editor
+    must not be modified until the thread finishes, the view points into its buffer.
+    """
+
+    def __init__(self, filePath, data, encoding, parent=None):
+        super().__init__(parent)
+        self.filePath = filePath
+        self.data = data
+        self.encoding = encoding
+        self.error = None
+
+    def run(self):
+        try:
+            with PROFILER.span("save.write", "io", path=self.filePath):
+                atomic_write(self.filePath, self.data, self.encoding)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.data = None
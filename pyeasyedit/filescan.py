@@ -0,0 +1,195 @@
+"""
+Directory walking and file scanning for Find in Files and Replace in Files.
+
+The scan functions run in worker processes. Nothing here imports PyQt6 at
+module level, so spawned workers start without loading Qt; only the replace
+jobs import fileio, to decode and write files the same way the editor does.
+"""
+import difflib
+import fnmatch
+import mmap
+import os
+
+BINARY_SAMPLE = 8192  # Files with a NUL byte in this many leading bytes are skipped as binary
+MMAP_THRESHOLD = 1 << 20  # Files at least this big are mapped instead of read
+MAX_MATCHES_PER_FILE = 1000
+MAX_DIFF_LINES = 400  # Preview lines kept per file
+DEFAULT_EXCLUDES = ".git, .hg, .svn, __pycache__, node_modules, *.pyc"
+
+
+def split_globs(text):
+    return [glob.strip() for glob in text.replace(";", ",").split(",") if glob.strip()]
+
+
+def matches_any(name, relativePath, globs):
+    return any(fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(relativePath, glob) for glob in globs)
+
+
+def walk_files(root, includes=(), excludes=(), isCancelled=None):
+    """
+    Yields the files under root depth first. Globs are matched against the name
+    and the /-separated path relative to root; excluded directories are pruned.
+    """
+    stack = [root]
+    while stack:
+        if isCancelled is not None and isCancelled():
+            return
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if matches_any(entry.name, relative_path, excludes):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file() and (not includes or matches_any(entry.name, relative_path, includes)):
+                    yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirectories))
+
+
+def in_scope(root, path, includes=(), excludes=()):
+    """
+    Whether walk_files(root, includes, excludes) would yield path.
+    """
+    relative_path = os.path.relpath(path, root)
+    if relative_path == os.curdir or relative_path.split(os.sep)[0] == os.pardir:
+        return False
+    parts = relative_path.split(os.sep)
+    for depth in range(1, len(parts) + 1):
+        if matches_any(parts[depth - 1], "/".join(parts[:depth]), excludes):
+            return False
+    return not includes or matches_any(parts[-1], "/".join(parts), includes)
+
+
+def find_in_data(data, pattern):
+    """
+    Returns [(line, column, preview)] for the matches of a bytes pattern in data,
+    with 0-based line and character column, or [] if data looks binary.
+    """
+    if b"\0" in data[:BINARY_SAMPLE]:
+        return []
+    results = []
+    line = 0
+    counted = 0
+    for match in pattern.finditer(data):
+        start = match.start()
+        if match.end() == start:
+            continue
+        line += data[counted:start].count(b"\n")
+        counted = start
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", start)
+        if line_end == -1:
+            line_end = len(data)
+        column = len(data[line_start:start].decode("utf-8", "replace"))
+        preview = data[line_start:line_end].decode("utf-8", "replace").strip()[:200]
+        results.append((line, column, preview))
+        if len(results) >= MAX_MATCHES_PER_FILE:
+            break
+    return results
+
+
+def scan_file(path, pattern):
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            return []
+        if size < MMAP_THRESHOLD:
+            return find_in_data(file.read(), pattern)
+        # Large files are mapped, pages are read as the regex reaches them
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return find_in_data(data, pattern)
+
+
+def scan_batch(paths, pattern):
+    """
+    Scans a batch of files in a worker process. Returns [(path, matches)] for the
+    files with at least one match; unreadable files are skipped.
+    """
+    results = []
+    for path in paths:
+        try:
+            matches = scan_file(path, pattern)
+        except (OSError, ValueError):
+            continue
+        if matches:
+            results.append((path, matches))
+    return results
+
+
+def replace_in_data(data, pattern, replacement, regex=False):
+    """
+    Returns (new_data, count) with every match of pattern in UTF-8 data replaced,
+    with the same semantics as search.replace_all: regex replacements may use
+    group references, plain ones are literal.
+    """
+    replacement = replacement.encode("utf-8")
+    if regex:
+        return pattern.subn(replacement, data)
+    return pattern.subn(lambda match: replacement, data)
+
+
+def replacement_diff(path, data, newData):
+    old_lines = data.decode("utf-8", "replace").splitlines(keepends=True)
+    new_lines = newData.decode("utf-8", "replace").splitlines(keepends=True)
+    diff = []
+    for line in difflib.unified_diff(old_lines, new_lines, fromfile=path, tofile=path, n=1):
+        if len(diff) >= MAX_DIFF_LINES:
+            diff.append("...\n")
+            break
+        diff.append(line if line.endswith("\n") else line + "\n")
+    return "".join(diff)
+
+
+def preview_batch(paths, pattern, replacement, regex=False):
+    """
+    Works out the replacements for a batch of files without writing anything.
+    Returns [(path, count, diff, mtime_ns)] for the files that would change.
+    """
+    from pyeasyedit.fileio import read_document
+
+    results = []
+    for path in paths:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            data, encoding, eol = read_document(path)
+        except (OSError, ValueError):
+            continue
+        if b"\0" in data[:BINARY_SAMPLE]:
+            continue
+        new_data, count = replace_in_data(data, pattern, replacement, regex)
+        if count and new_data != data:
+            results.append((path, count, replacement_diff(path, data, new_data), mtime_ns))
+    return results
+
+
+def commit_batch(items, pattern, replacement, regex=False):
+    """
+    Rewrites each (path, mtime_ns) from a preview with atomic_write, in the file's
+    own encoding. Files modified since the preview are left alone. Returns
+    [(path, count, error)].
+    """
+    from pyeasyedit.fileio import atomic_write, read_document
+
+    results = []
+    for path, mtime_ns in items:
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                results.append((path, 0, "changed on disk since the preview"))
+                continue
+            data, encoding, eol = read_document(path)
+            new_data, count = replace_in_data(data, pattern, replacement, regex)
+            atomic_write(path, new_data, encoding)
+            results.append((path, count, None))
+        except (OSError, ValueError) as e:
+            results.append((path, 0, str(e)))
+    return results
@@ -0,0 +1,447 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox, \
+    QTreeWidget, QTreeWidgetItem, QSplitter, QPlainTextEdit, QMessageBox
+
+from pyeasyedit.filescan import DEFAULT_EXCLUDES, commit_batch, in_scope, preview_batch, replace_in_data, \
+    replacement_diff, scan_batch, split_globs, walk_files
+from pyeasyedit.search import compile_pattern, replace_all
+
+DIFF_ROLE = Qt.ItemDataRole.UserRole + 1  # Preview diff of a file in Replace in Files
+MTIME_ROLE = Qt.ItemDataRole.UserRole + 2  # Modification time the preview was made against, None for open tabs
+
+
+def scan_worker_count():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def create_scan_pool():
+    # Spawned rather than forked, forking a process that runs Qt threads is unsafe
+    return ProcessPoolExecutor(max_workers=scan_worker_count(), mp_context=multiprocessing.get_context("spawn"))
+
+
+class FindInFilesThread(QThread):
+    """
+    Walks the tree, or goes through a given list of items, and hands batches of
+    them to job in a process pool, emitting each batch's results as it completes.
+    Only a few batches are queued at a time, so cancelling stops quickly and
+    memory does not grow with the tree.
+    """
+    resultsFound = pyqtSignal(list)  # Whatever job returns for a batch
+    progress = pyqtSignal(int)  # Items submitted so far
+    searchFinished = pyqtSignal(int, bool)  # Items submitted, cancelled
+    searchFailed = pyqtSignal(str)
+
+    BATCH_FILES = 64
+
+    def __init__(self, root, includes, excludes, executor, job=scan_batch, jobArgs=(), items=None, skip=(),
+                 parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.includes = includes
+        self.excludes = excludes
+        self.executor = executor
+        self.job = job
+        self.jobArgs = jobArgs
+        self.items = items  # Instead of walking the tree
+        self.skip = skip  # Normalized paths left out of the walk
+        self.maxInFlight = 2 * scan_worker_count()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def walk(self):
+        for path in walk_files(self.root, self.includes, self.excludes, lambda: self.cancelled):
+            if os.path.normcase(path) not in self.skip:
+                yield path
+
+    def collect(self, pending, block=True):
+        done, _ = wait(pending, timeout=0.1 if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.discard(future)
+            if future.cancelled():
+                continue
+            results = future.result()
+            if results and not self.cancelled:
+                self.resultsFound.emit(results)
+
+    def run(self):
+        pending = set()
+        submitted = 0
+        try:
+            batch = []
+            for item in (self.items if self.items is not None else self.walk()):
+                if self.cancelled:
+                    break
+                batch.append(item)
+                if len(batch) < self.BATCH_FILES:
+                    continue
+                pending.add(self.executor.submit(self.job, batch, *self.jobArgs))
+                submitted += len(batch)
+                batch = []
+                self.progress.emit(submitted)
+                self.collect(pending, block=False)
+                while len(pending) >= self.maxInFlight and not self.cancelled:
+                    self.collect(pending)
+            if batch and not self.cancelled:
+                pending.add(self.executor.submit(self.job, batch, *self.jobArgs))
+                submitted += len(batch)
+            while pending and not self.cancelled:
+                self.collect(pending)
+        except Exception as e:
+            self.searchFailed.emit(str(e))
+        finally:
+            for future in pending:
+                future.cancel()
+            self.searchFinished.emit(submitted, self.cancelled)
+
+
+class FindInFilesPanel(QWidget):
+    """
+    Find and Replace in Files over the workspace folder. Search results stream
+    into a tree, one item per file with its matches underneath; activating a
+    match opens it. Replace first previews every change as a diff, then commits
+    the checked files: on disk with an atomic write per file, or through the
+    editor for files open in a tab.
+    """
+    openRequested = pyqtSignal(str, int, int)  # Path, line, column
+
+    MAX_RESULTS = 50000  # Matches shown before the rest are only counted
+
+    def __init__(self, parent=None, openEditors=None):
+        super().__init__(parent)
+        self.rootPath = None
+        # Returns {normalized path: editor} for the open tabs, None for a tab whose text is not
+        # available (still loading, or hibernated with unsaved changes)
+        self.openEditors = openEditors
+        self.executor = None
+        self.searchThread = None
+        self.mode = "find"  # Or "preview" and "apply" for Replace in Files
+        self.previewKey = None  # Search and replace settings the current preview was made with
+        self.matchCount = 0
+        self.fileCount = 0
+        self.failures = []
+        self.skippedOpen = []  # Open tabs left out of the preview, see openEditors
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        searchRow = QHBoxLayout()
+        self.searchField = QLineEdit(self)
+        self.searchField.setPlaceholderText("Find in files")
+        self.searchField.returnPressed.connect(self.startSearch)
+        searchRow.addWidget(self.searchField)
+
+        self.replaceField = QLineEdit(self)
+        self.replaceField.setPlaceholderText("Replace with")
+        self.replaceField.returnPressed.connect(self.startPreview)
+        searchRow.addWidget(self.replaceField)
+
+        self.includeField = QLineEdit(self)
+        self.includeField.setPlaceholderText("Include, e.g. *.cfg, *.yml")
+        self.includeField.returnPressed.connect(self.startSearch)
+        searchRow.addWidget(self.includeField)
+
+        self.excludeField = QLineEdit(DEFAULT_EXCLUDES, self)
+        self.excludeField.setPlaceholderText("Exclude")
+        self.excludeField.returnPressed.connect(self.startSearch)
+        searchRow.addWidget(self.excludeField)
+        layout.addLayout(searchRow)
+
+        optionsRow = QHBoxLayout()
+        self.regexCheck = QCheckBox("Regular expression", self)
+        optionsRow.addWidget(self.regexCheck)
+        self.caseCheck = QCheckBox("Match case", self)
+        self.caseCheck.setChecked(True)
+        optionsRow.addWidget(self.caseCheck)
+        self.wordCheck = QCheckBox("Whole word", self)
+        optionsRow.addWidget(self.wordCheck)
+        optionsRow.addStretch()
+
+        self.findButton = QPushButton("Find", self)
+        self.findButton.clicked.connect(self.startSearch)
+        optionsRow.addWidget(self.findButton)
+        self.previewButton = QPushButton("Preview Replace", self)
+        self.previewButton.clicked.connect(self.startPreview)
+        optionsRow.addWidget(self.previewButton)
+        self.applyButton = QPushButton("Replace Checked", self)
+        self.applyButton.clicked.connect(self.applyReplace)
+        self.applyButton.setEnabled(False)
+        optionsRow.addWidget(self.applyButton)
+        self.cancelButton = QPushButton("Cancel", self)
+        self.cancelButton.clicked.connect(self.cancelSearch)
+        self.cancelButton.setEnabled(False)
+        optionsRow.addWidget(self.cancelButton)
+        self.closeButton = QPushButton("Close", self)
+        self.closeButton.clicked.connect(self.hide)
+        optionsRow.addWidget(self.closeButton)
+        layout.addLayout(optionsRow)
+
+        self.statusLabel = QLabel("", self)
+        layout.addWidget(self.statusLabel)
+
+        self.resultsTree = QTreeWidget(self)
+        self.resultsTree.setHeaderHidden(True)
+        self.resultsTree.setUniformRowHeights(True)
+        self.resultsTree.itemActivated.connect(self.onItemActivated)
+        self.resultsTree.currentItemChanged.connect(self.showDiff)
+
+        # Replace preview diff of the selected file
+        self.diffView = QPlainTextEdit(self)
+        self.diffView.setReadOnly(True)
+        self.diffView.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.diffView.hide()
+
+        resultsSplitter = QSplitter(Qt.Orientation.Horizontal, self)
+        resultsSplitter.addWidget(self.resultsTree)
+        resultsSplitter.addWidget(self.diffView)
+        layout.addWidget(resultsSplitter)
+
+    def setRootPath(self, rootPath):
+        self.rootPath = rootPath
+
+    def searchOptions(self):
+        return self.regexCheck.isChecked(), self.caseCheck.isChecked(), self.wordCheck.isChecked()
+
+    def compileSearch(self):
+        text = self.searchField.text()
+        if not text or not self.rootPath:
+            return None
+        try:
+            return compile_pattern(text, *self.searchOptions())
+        except re.error as e:
+            self.statusLabel.setText(f"Invalid regular expression: {e}")
+            return None
+
+    def replaceKey(self):
+        return (self.searchField.text(), self.replaceField.text(), self.searchOptions(),
+                self.includeField.text(), self.excludeField.text())
+
+    def startThread(self, mode, status, job=scan_batch, jobArgs=(), items=None, skip=()):
+        self.cancelSearch()
+        if self.executor is None:
+            self.executor = create_scan_pool()
+        self.mode = mode
+        self.matchCount = 0
+        self.fileCount = 0
+        self.failures = []
+        self.skippedOpen = []
+        self.statusLabel.setText(status)
+        self.setBusy(True)
+
+        self.searchThread = FindInFilesThread(self.rootPath, split_globs(self.includeField.text()),
+                                              split_globs(self.excludeField.text()), self.executor,
+                                              job, jobArgs, items, skip, self)
+        self.searchThread.resultsFound.connect(self.addResults)
+        self.searchThread.progress.connect(self.onProgress)
+        self.searchThread.searchFinished.connect(self.onSearchFinished)
+        self.searchThread.searchFailed.connect(self.onSearchFailed)
+        self.searchThread.start()
+
+    def setBusy(self, busy):
+        self.findButton.setEnabled(not busy)
+        self.previewButton.setEnabled(not busy)
+        self.applyButton.setEnabled(not busy and self.mode == "preview" and self.previewKey is not None)
+        self.cancelButton.setEnabled(busy)
+
+    def startSearch(self):
+        pattern = self.compileSearch()
+        if pattern is None:
+            return
+        self.previewKey = None
+        self.resultsTree.clear()
+        self.diffView.hide()
+        self.startThread("find", f"Searching {self.rootPath}...", scan_batch, (pattern,))
+
+    def startPreview(self):
+        pattern = self.compileSearch()
+        if pattern is None:
+            return
+        regex = self.regexCheck.isChecked()
+        replacement = self.replaceField.text()
+        self.previewKey = self.replaceKey()
+        self.resultsTree.clear()
+        self.diffView.clear()
+        self.diffView.show()
+
+        # Open tabs are previewed from their editors, unsaved changes included
+        openEditors = self.openEditors() if self.openEditors else {}
+        self.startThread("preview", f"Previewing replacements in {self.rootPath}...", preview_batch,
+                         (pattern, replacement, regex), skip=set(openEditors))
+        includes = split_globs(self.includeField.text())
+        excludes = split_globs(self.excludeField.text())
+        for path, editor in openEditors.items():
+            if not in_scope(self.rootPath, path, includes, excludes):
+                continue
+            if editor is None:
+                # Its file on disk is not what the tab will show, replacing there would be lost
+                self.skippedOpen.append(path)
+                continue
+            data = bytes(editor.documentBuffer())
+            new_data, count = replace_in_data(data, pattern, replacement, regex)
+            if count and new_data != data:
+                # The on-disk mtime still matters, the tab may be closed before Apply
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    mtime_ns = None
+                self.addPreviewItem(path, count, replacement_diff(path, data, new_data), mtime_ns, isOpen=True)
+
+    def applyReplace(self):
+        if self.previewKey != self.replaceKey():
+            self.statusLabel.setText("The search or replacement changed, preview again before replacing.")
+            return
+        pattern = self.compileSearch()
+        if pattern is None:
+            return
+        text, replacement, (regex, caseSensitive, wholeWord), _, _ = self.previewKey
+        openEditors = self.openEditors() if self.openEditors else {}
+        editors = []
+        items = []
+        skipped = []
+        for i in range(self.resultsTree.topLevelItemCount()):
+            item = self.resultsTree.topLevelItem(i)
+            if item.checkState(0) != Qt.CheckState.Checked:
+                continue
+            path = item.data(0, Qt.ItemDataRole.UserRole)[0]
+            key = os.path.normcase(path)
+            if key not in openEditors:
+                items.append((path, item.data(0, MTIME_ROLE)))
+            elif openEditors[key] is not None:
+                editors.append(openEditors[key])
+            else:
+                skipped.append(path)  # Hibernated with unsaved changes or reloading since the preview
+        if not editors and not items:
+            if skipped:
+                self.statusLabel.setText(f"{len(skipped)} file(s) are open in a tab that is loading or "
+                                         f"hibernated with unsaved changes, switch to it and preview again.")
+            return
+        if items and QMessageBox.question(self, "Replace in Files",
+                                          f"Replace in {len(items)} file(s) on disk? This cannot be undone.") \
+                != QMessageBox.StandardButton.Yes:
+            return
+
+        # Open tabs get one undoable edit each, saving them is left to the user
+        replaced = sum(replace_all(editor, text, replacement, regex, caseSensitive, wholeWord) for editor in editors)
+        self.previewKey = None
+        self.resultsTree.clear()
+        self.diffView.clear()
+        if items:
+            self.startThread("apply", "Replacing...", commit_batch, (pattern, replacement, regex), items=items)
+        else:
+            self.mode = "apply"
+            self.setBusy(False)
+        self.failures = [f"{path}: open in a tab that is loading or hibernated with unsaved changes, not replaced"
+                         for path in skipped]
+        self.matchCount = replaced
+        self.fileCount = len(editors)
+        if not items:
+            self.showReplaceSummary(False)
+
+    def cancelSearch(self):
+        if self.searchThread is not None:
+            self.searchThread.cancel()
+            self.searchThread.wait()
+            self.searchThread = None
+
+    def addResults(self, results):
+        if self.sender() is not self.searchThread:
+            return  # A late batch from a cancelled search
+        self.resultsTree.setUpdatesEnabled(False)
+        if self.mode == "find":
+            for path, matches in results:
+                self.addMatchItems(path, matches)
+        elif self.mode == "preview":
+            for path, count, diff, mtime_ns in results:
+                self.addPreviewItem(path, count, diff, mtime_ns)
+        else:
+            for path, count, error in results:
+                if error:
+                    self.failures.append(f"{path}: {error}")
+                else:
+                    self.fileCount += 1
+                    self.matchCount += count
+        self.resultsTree.setUpdatesEnabled(True)
+        if self.mode != "apply":
+            self.updateStatus("Searching...")
+
+    def addMatchItems(self, path, matches):
+        self.fileCount += 1
+        shown = max(0, min(len(matches), self.MAX_RESULTS - self.matchCount))
+        self.matchCount += len(matches)
+        if not shown:
+            return
+        fileItem = QTreeWidgetItem([f"{os.path.relpath(path, self.rootPath)} ({len(matches)})"])
+        fileItem.setData(0, Qt.ItemDataRole.UserRole, (path, 0, 0))
+        for line, column, preview in matches[:shown]:
+            matchItem = QTreeWidgetItem([f"{line + 1}: {preview}"])
+            matchItem.setData(0, Qt.ItemDataRole.UserRole, (path, line, column))
+            fileItem.addChild(matchItem)
+        self.resultsTree.addTopLevelItem(fileItem)
+
+    def addPreviewItem(self, path, count, diff, mtime_ns, isOpen=False):
+        self.fileCount += 1
+        self.matchCount += count
+        label = f"{os.path.relpath(path, self.rootPath)} ({count})"
+        fileItem = QTreeWidgetItem([label + (" [open]" if isOpen else "")])
+        fileItem.setFlags(fileItem.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        fileItem.setCheckState(0, Qt.CheckState.Checked)
+        fileItem.setData(0, Qt.ItemDataRole.UserRole, (path, 0, 0))
+        fileItem.setData(0, DIFF_ROLE, diff)
+        fileItem.setData(0, MTIME_ROLE, mtime_ns)
+        self.resultsTree.addTopLevelItem(fileItem)
+
+    def showDiff(self, current, previous):
+        if current is not None and current.data(0, DIFF_ROLE) is not None:
+            self.diffView.setPlainText(current.data(0, DIFF_ROLE))
+
+    def updateStatus(self, state):
+        text = f"{state} {self.matchCount} match(es) in {self.fileCount} file(s)"
+        if self.matchCount > self.MAX_RESULTS and self.mode == "find":
+            text += f", showing the first {self.MAX_RESULTS}"
+        if self.skippedOpen and self.mode == "preview":
+            text += (f", skipped {len(self.skippedOpen)} open file(s) that are loading or hibernated"
+                     f" with unsaved changes")
+        self.statusLabel.setText(text)
+
+    def onProgress(self, submitted):
+        if self.sender() is self.searchThread and not self.matchCount:
+            self.statusLabel.setText(f"Searching... {submitted} file(s) queued")
+
+    def onSearchFinished(self, scanned, cancelled):
+        if self.sender() is not self.searchThread and self.searchThread is not None:
+            return
+        self.setBusy(False)
+        if self.mode == "apply":
+            self.showReplaceSummary(cancelled)
+        elif self.mode == "preview":
+            self.updateStatus("Cancelled," if cancelled else "Would replace")
+        else:
+            self.updateStatus("Cancelled," if cancelled else f"Searched {scanned} file(s),")
+
+    def showReplaceSummary(self, cancelled):
+        text = f"Replaced {self.matchCount} occurrence(s) in {self.fileCount} file(s)"
+        if self.failures:
+            text += f", {len(self.failures)} file(s) failed"
+            self.diffView.setPlainText("\n".join(self.failures))
+        self.statusLabel.setText(text + (" before cancelling." if cancelled else "."))
+
+    def onSearchFailed(self, error):
+        self.statusLabel.setText(f"Find in Files failed: {error}")
+
+    def onItemActivated(self, item, column):
+        path, line, column = item.data(0, Qt.ItemDataRole.UserRole)
+        self.openRequested.emit(path, line, column)
+
+    def shutdown(self):
+        self.cancelSearch()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
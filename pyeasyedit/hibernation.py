@@ -0,0 +1,148 @@
+"""
+Inactive tab hibernation.
+
+Every open tab keeps its whole Scintilla document, style bytes and undo history
+in memory. MemoryBudgetManager hibernates tabs that have been in the background
+longer than a configurable time, or the longest idle ones first once the open
+documents go over a memory budget. EditorWidget.hibernateTab swaps a hibernated
+editor for a TabPlaceholder that keeps only the path, mtime and view state, and
+activating the tab loads it again. Unsaved changes are spilled to a swap file
+under ~/.pyeasyedit/swap first; they come back as a modified document, without
+their undo history. Each running editor has its own swap directory there, held
+by a lock file, and remove_stale_swaps clears the ones left by an editor that
+crashed or was killed.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from PyQt6.QtCore import QLockFile, QObject, QTimer
+
+from pyeasyedit.pyeasylib import get_config_directory
+
+CHECK_INTERVAL_MS = 30000
+HIBERNATE_AFTER_MINUTES = 15  # Overridden by "hibernate_after_minutes" in config.json, 0 turns it off
+LINE_INDEX_BYTES = 16  # Rough cost of a line in Scintilla's line index
+
+
+_swap_lock = None  # Held while this process has a swap directory
+
+
+def swap_root():
+    return os.path.join(get_config_directory(), "swap")
+
+
+def swap_directory():
+    global _swap_lock
+    directory = os.path.join(swap_root(), str(os.getpid()))
+    if _swap_lock is None:
+        os.makedirs(directory, exist_ok=True)
+        _swap_lock = QLockFile(directory + ".lock")
+        _swap_lock.setStaleLockTime(0)  # Only a dead owner makes it stale, not its age
+        _swap_lock.tryLock(0)
+    return directory
+
+
+def release_swap_directory():
+    # On a clean exit, any swap file left is unsaved work the user chose to discard
+    global _swap_lock
+    if _swap_lock is not None:
+        shutil.rmtree(os.path.join(swap_root(), str(os.getpid())), ignore_errors=True)
+        _swap_lock.unlock()
+        _swap_lock = None
+
+
+def remove_stale_swaps():
+    """
+    Removes the swap directories of editors that are no longer running. A lock
+    that can be taken belonged to a process that has gone; QLockFile checks the
+    owner's pid.
+    """
+    try:
+        names = os.listdir(swap_root())
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(".lock") or name == f"{os.getpid()}.lock":
+            continue
+        lockPath = os.path.join(swap_root(), name)
+        lock = QLockFile(lockPath)
+        lock.setStaleLockTime(0)
+        if lock.tryLock(0):
+            shutil.rmtree(lockPath[:-len(".lock")], ignore_errors=True)
+            lock.unlock()
+
+
+def write_swap(filePath, data):
+    # mkstemp creates the file readable by the user only
+    fd, swapPath = tempfile.mkstemp(dir=swap_directory(), prefix=os.path.basename(filePath) + ".", suffix=".swp")
+    with os.fdopen(fd, "wb") as swap_file:
+        swap_file.write(data)
+    return swapPath
+
+
+def read_swap(swapPath):
+    with open(swapPath, "rb") as swap_file:
+        return swap_file.read()
+
+
+def remove_swap(swapPath):
+    try:
+        os.remove(swapPath)
+    except OSError:
+        pass
+
+
+def document_memory(editor):
+    """
+    Estimated bytes held by a QsciScintilla document: the text, a style byte per
+    character once a lexer styles it and the line index. Scintilla does not
+    expose the size of the undo history, so it is not counted.
+    """
+    length = editor.length()
+    return length + (length if editor.lexer() is not None else 0) + editor.lines() * LINE_INDEX_BYTES
+
+
+class MemoryBudgetManager(QObject):
+    """
+    Checks the tabs of tabWidget every CHECK_INTERVAL_MS and calls
+    hibernate(index) for background editors idle longer than idleSeconds, then
+    for the longest idle ones while the estimated total is over budgetBytes.
+    Either limit is off when 0.
+    """
+
+    def __init__(self, tabWidget, hibernate, idleSeconds=HIBERNATE_AFTER_MINUTES * 60, budgetBytes=0, parent=None):
+        super().__init__(parent)
+        self.tabWidget = tabWidget
+        self.hibernate = hibernate
+        self.idleSeconds = idleSeconds
+        self.budgetBytes = budgetBytes
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        if idleSeconds or budgetBytes:
+            self.timer.start(CHECK_INTERVAL_MS)
+
+    def check(self):
+        now = time.monotonic()
+        total = 0
+        candidates = []  # (inactive since, editor widget) for tabs that could be hibernated
+        for i in range(self.tabWidget.count()):
+            widget = self.tabWidget.widget(i)
+            total += widget.memoryUsage()
+            if i == self.tabWidget.currentIndex():
+                widget.inactiveSince = None
+            elif getattr(widget, "canHibernate", None) and widget.canHibernate():
+                if getattr(widget, "inactiveSince", None) is None:
+                    widget.inactiveSince = now  # Idle time is counted from the first check that sees it
+                candidates.append((widget.inactiveSince, widget))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        for since, widget in candidates:
+            idle = self.idleSeconds and now - since >= self.idleSeconds
+            overBudget = self.budgetBytes and total > self.budgetBytes
+            if not (idle or overBudget):
+                continue
+            usage = widget.memoryUsage()
+            if self.hibernate(self.tabWidget.indexOf(widget)):
+                total -= usage
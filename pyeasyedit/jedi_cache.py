@@ -0,0 +1,164 @@
+"""
+Process-wide Jedi caches shared by every editor tab.
+
+Nothing here imports PyQt6, so the out-of-process completion server can use the
+same bookkeeping as the editor. Jedi itself is imported on first use, it is
+the single most expensive import in the editor and has no place on the startup
+path.
+"""
+import os
+import sys
+import threading
+import time
+
+
+def is_stdlib_module(script, line, column, module, localRoots=()):
+    """
+    True if Jedi resolves the name ending before column on line to the stdlib
+    module itself, not to a variable or a file of the user's shadowing it, so
+    its members are the same for every file on that interpreter.
+    """
+    try:
+        names = script.infer(line, column)
+    except Exception:
+        return False
+    roots = [os.path.join(os.path.abspath(root), "") for root in localRoots if root]
+    for name in names:
+        if name.type != "module" or name.full_name != module:
+            return False
+        path = os.path.abspath(str(name.module_path)) if name.module_path else ""
+        if any(path.startswith(root) for root in roots):
+            return False
+    return bool(names)
+
+
+class PreloadRegistry:
+    """
+    Records which modules have already been handed to jedi.preload_module so each
+    import is preloaded once per environment instead of on every keystroke.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.environmentKey = None
+        self.preloaded = set()
+        self.scheduled = set()
+        self.hits = 0
+        self.misses = 0
+        self.preloadCount = 0
+        self.preloadErrors = 0
+        self.preloadTime = 0.0
+
+    def invalidate(self, environmentKey=None):
+        with self.lock:
+            self.environmentKey = environmentKey
+            self.preloaded.clear()
+            self.scheduled.clear()
+
+    def releaseScheduled(self):
+        # Preloads that were queued but will never run, they are claimed again on the next request
+        with self.lock:
+            self.scheduled.clear()
+
+    def claimMissing(self, modules, environmentKey):
+        """
+        Returns the modules that still need preloading and marks them scheduled,
+        so concurrent callers never queue the same module twice.
+        """
+        with self.lock:
+            if environmentKey != self.environmentKey:
+                # Preloads done for another interpreter say nothing about this one
+                self.environmentKey = environmentKey
+                self.preloaded.clear()
+                self.scheduled.clear()
+
+            missing = []
+            for module in modules:
+                if module in self.preloaded or module in self.scheduled:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    self.scheduled.add(module)
+                    missing.append(module)
+            return missing
+
+    def preload(self, module, environmentKey):
+        import jedi
+
+        start = time.perf_counter()
+        try:
+            jedi.preload_module(module)
+            failed = False
+        except Exception:
+            failed = True
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.preloadCount += 1
+            self.preloadTime += elapsed
+            if failed:
+                self.preloadErrors += 1
+            if environmentKey == self.environmentKey and module in self.scheduled:
+                self.scheduled.discard(module)
+                # Failed modules stay recorded too, retrying them every keystroke is the cost we are avoiding
+                self.preloaded.add(module)
+        return not failed
+
+    def stats(self):
+        with self.lock:
+            return {
+                "environment": self.environmentKey,
+                "preloaded": len(self.preloaded),
+                "pending": len(self.scheduled),
+                "hits": self.hits,
+                "misses": self.misses,
+                "preload_count": self.preloadCount,
+                "preload_errors": self.preloadErrors,
+                "preload_time": self.preloadTime,
+            }
+
+
+PRELOAD_REGISTRY = PreloadRegistry()
+
+
+class JediEnvironmentManager:
+    """
+    One jedi environment per interpreter path and one jedi.Project per workspace
+    root, shared by all tabs so Jedi's internal caches survive between files.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.environments = {}
+        self.projects = {}
+
+    def environment(self, executable=None):
+        executable = executable or sys.executable
+        # Creation is held under the lock so a background warm-up and a tab opening
+        # at the same time introspect the interpreter only once
+        with self.lock:
+            environment = self.environments.get(executable)
+            if environment is None:
+                import jedi
+                environment = jedi.create_environment(executable)
+                self.environments[executable] = environment
+            return environment
+
+    def cachedEnvironment(self, executable=None):
+        # Never waits for a creation in progress, the UI thread uses this to decide
+        # whether to attach Jedi now or after the background warm-up
+        return self.environments.get(executable or sys.executable)
+
+    def project(self, root, executable=None):
+        executable = executable or sys.executable
+        key = (os.path.abspath(root), executable)
+        with self.lock:
+            project = self.projects.get(key)
+            if project is None:
+                import jedi
+                project = jedi.Project(key[0], environment_path=executable)
+                self.projects[key] = project
+            return project
+
+
+JEDI_ENVIRONMENTS = JediEnvironmentManager()
@@ -0,0 +1,230 @@
+"""
+Out-of-process Jedi completion server.
+
+The server runs as ``python -m pyeasyedit.jedi_server <environment>`` and answers
+JSON-line requests on stdin/stdout, so heavy or hung inference never holds the
+editor's GIL. A completion still queued when a newer one arrives is skipped
+unanswered, so fast typing never waits behind stale inference. It deliberately
+imports nothing from PyQt6.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+
+def read_requests(stdin, requests):
+    # Reads ahead of the inference, so requests queued behind a slow one can be skipped
+    for line in stdin:
+        try:
+            requests.put(json.loads(line))
+        except ValueError:
+            continue
+    requests.put(None)  # EOF, the editor has gone
+
+
+def pending_requests(requests):
+    """
+    Waits for a request and returns it with any others already queued. Of the
+    completions only the newest is kept, the client has given up on the rest.
+    """
+    batch = [requests.get()]
+    while True:
+        try:
+            batch.append(requests.get_nowait())
+        except queue.Empty:
+            break
+    completions = [request for request in batch if request is not None and request.get("op") == "complete"]
+    return [request for request in batch if request is None or request.get("op") != "complete"
+            or request is completions[-1]]
+
+
+def serve(environment_path, stdin=None, stdout=None):
+    import jedi
+    from pyeasyedit.jedi_cache import JEDI_ENVIRONMENTS, PRELOAD_REGISTRY, is_stdlib_module
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    environment = JEDI_ENVIRONMENTS.environment(environment_path)
+    stdout.write(json.dumps({"ready": True}) + "\n")
+    stdout.flush()
+
+    requests = queue.Queue()
+    threading.Thread(target=read_requests, args=(stdin, requests), daemon=True).start()
+    while True:
+        for request in pending_requests(requests):
+            if request is None:
+                return
+            response = {"id": request.get("id")}
+            try:
+                if request.get("op") == "complete":
+                    for module in PRELOAD_REGISTRY.claimMissing(request.get("preload", []), environment_path):
+                        PRELOAD_REGISTRY.preload(module, environment_path)
+                    project = None
+                    if request.get("project"):
+                        project = JEDI_ENVIRONMENTS.project(request["project"], environment_path)
+                    script = jedi.Script(code=request["code"], path=request.get("path"),
+                                         environment=environment, project=project)
+                    completions = script.complete(line=request["line"], column=request["column"])
+                    response["completions"] = [comp.name for comp in completions]
+                    if request.get("module"):
+                        localRoots = (request.get("project"), os.path.dirname(request.get("path") or ""))
+                        response["stdlib"] = is_stdlib_module(script, request["line"], request["column"] - 1,
+                                                              request["module"], localRoots)
+                    response["preload_stats"] = PRELOAD_REGISTRY.stats()
+                elif request.get("op") == "ping":
+                    response["pong"] = True
+                else:
+                    response["error"] = f"Unknown op {request.get('op')!r}"
+            except Exception as e:
+                response["error"] = str(e)
+
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+
+class JediServerClient:
+    """
+    Client side of one server process. Requests are sent one at a time from the
+    completion worker thread; a reader thread collects responses so waits can
+    time out, be cancelled, and notice the child dying.
+    """
+
+    def __init__(self, environment_path, timeout=5.0, startupTimeout=30.0):
+        self.environment_path = environment_path
+        self.timeout = timeout
+        self.startupTimeout = startupTimeout  # Interpreter start and environment creation
+        self.ready = False
+        self.process = None
+        self.responses = queue.Queue()
+        self.lock = threading.Lock()
+        self.nextId = 0
+        self.restarts = 0
+        self.lastPreloadStats = None  # The child's PreloadRegistry counters from its latest answer
+
+    def isRunning(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        # Make sure the child can import this package even when running from a source checkout
+        env = dict(os.environ)
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "pyeasyedit.jedi_server", self.environment_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", bufsize=1, creationflags=creationflags, env=env
+        )
+        self.ready = False
+        self.responses = queue.Queue()
+        reader = threading.Thread(target=self._readResponses, args=(self.process, self.responses), daemon=True)
+        reader.start()
+
+    def _readResponses(self, process, responses):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                continue
+        responses.put(None)  # EOF, the child has exited
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.kill()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def complete(self, code, path, line, column, preload=(), projectRoot=None, isCancelled=None, module=None):
+        """
+        Returns (completion names, whether the name before the dot is the stdlib
+        module called module), or None if the request was cancelled, timed out or
+        the server died. A timed out or dead server is restarted.
+        """
+        with self.lock:
+            if self.process is None:
+                self.start()
+            elif not self.isRunning():
+                self.restart()
+
+            self.nextId += 1
+            request_id = self.nextId
+            request = {"id": request_id, "op": "complete", "code": code, "path": path,
+                       "line": line, "column": column, "preload": list(preload), "project": projectRoot,
+                       "module": module}
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+            except OSError:
+                self.restart()
+                return None
+
+            deadline = time.monotonic() + (self.timeout if self.ready else self.startupTimeout)
+            while True:
+                if isCancelled is not None and isCancelled():
+                    # The child finishes the inference it is in, but skips this request if it is
+                    # still queued when the next one arrives. A late answer is discarded by id
+                    return None
+                if time.monotonic() > deadline:
+                    self.restart()
+                    return None
+                try:
+                    response = self.responses.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if response is None:
+                    self.restart()
+                    return None
+                if response.get("ready"):
+                    self.ready = True
+                    deadline = time.monotonic() + self.timeout
+                    continue
+                if response.get("id") != request_id:
+                    continue  # Answer to a request we already gave up on
+                if "error" in response:
+                    raise RuntimeError(response["error"])
+                self.lastPreloadStats = response.get("preload_stats", self.lastPreloadStats)
+                return response.get("completions", []), response.get("stdlib", False)
+
+
+class JediServerPool:
+    """
+    One long-lived server per interpreter environment.
+    """
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def client(self, environment_path):
+        with self.lock:
+            client = self.clients.get(environment_path)
+            if client is None:
+                client = JediServerClient(environment_path, self.timeout)
+                self.clients[environment_path] = client
+            return client
+
+    def shutdown(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.stop()
+            self.clients.clear()
+
+
+if __name__ == "__main__":
+    sys.stdin.reconfigure(encoding="utf-8")
+    sys.stdout.reconfigure(encoding="utf-8")
+    serve(sys.argv[1] if len(sys.argv) > 1 else sys.executable)
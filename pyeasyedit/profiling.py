@@ -0,0 +1,202 @@
+"""
+Built-in profiling: timed spans and latency histograms.
+
+Everything is recorded through the module-level PROFILER. While it is disabled
+span() hands back a shared no-op context manager and @profiled functions call
+straight through, so the instrumentation left in hot paths costs one attribute
+check. Recordings export as plain JSON or in the Chrome trace event format,
+which chrome://tracing and Perfetto open directly.
+
+Nothing here imports PyQt6, so the launcher can time its own imports and worker
+threads can record spans.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+
+MAX_SPANS = 100000  # Oldest spans are dropped beyond this
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_NO_SPAN = nullcontext()
+
+
+class Histogram:
+    """
+    Latencies in fixed millisecond buckets. The last bucket counts everything
+    above the largest bound.
+    """
+
+    def __init__(self, bounds=HISTOGRAM_BOUNDS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, milliseconds):
+        self.counts[bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.maximum = max(self.maximum, milliseconds)
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the percentile, or the maximum past the last bound
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return bound
+        return self.maximum
+
+    def toDict(self):
+        buckets = {f"<={bound}ms": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.maximum,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+    def summary(self):
+        if not self.count:
+            return "no samples"
+        return (f"{self.count} samples, mean {self.total / self.count:.1f} ms, p50 <= {self.percentile(0.5):g} ms, "
+                f"p90 <= {self.percentile(0.9):g} ms, p99 <= {self.percentile(0.99):g} ms, "
+                f"max {self.maximum:.1f} ms")
+
+
+class Span:
+    __slots__ = ("profiler", "name", "category", "args", "start")
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter(), self.category, self.args)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()  # Trace timestamps are relative to this
+        self.spans = deque(maxlen=MAX_SPANS)
+        self.histograms = {}
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+    def span(self, name, category="editor", **args):
+        if not self.enabled:
+            return _NO_SPAN
+        return Span(self, name, category, args or None)
+
+    def record(self, name, start, end, category="editor", args=None):
+        """
+        Records a span that was timed by hand, for work that starts in one call
+        and finishes in another, e.g. a load completed by a worker thread.
+        """
+        if not self.enabled:
+            return
+        span = (name, category, start, end - start, threading.get_ident(), args)
+        with self.lock:
+            self.spans.append(span)
+
+    def recordLatency(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    def clear(self):
+        with self.lock:
+            self.spans.clear()
+            self.histograms.clear()
+
+    def toJson(self):
+        with self.lock:
+            spans = list(self.spans)
+            histograms = {name: histogram.toDict() for name, histogram in self.histograms.items()}
+        return {
+            "spans": [
+                {"name": name, "category": category, "start_ms": (start - self.origin) * 1000,
+                 "duration_ms": duration * 1000, "thread": thread, "args": args or {}}
+                for name, category, start, duration, thread, args in spans
+            ],
+            "histograms": histograms,
+        }
+
+    def toChromeTrace(self):
+        pid = os.getpid()
+        with self.lock:
+            spans = list(self.spans)
+            histograms = {name: histogram.toDict() for name, histogram in self.histograms.items()}
+        events = [
+            {"name": name, "cat": category, "ph": "X", "ts": (start - self.origin) * 1e6, "dur": duration * 1e6,
+             "pid": pid, "tid": thread, "args": args or {}}
+            for name, category, start, duration, thread, args in spans
+        ]
+        # Histograms have no trace event of their own, viewers keep otherData as metadata
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"histograms": histograms}}
+
+    def export(self, path, chrome=None):
+        """
+        Writes the recording to path, in Chrome trace format if chrome is true or,
+        by default, if the file name ends in .trace.json.
+        """
+        if chrome is None:
+            chrome = path.endswith(".trace.json")
+        data = self.toChromeTrace() if chrome else self.toJson()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+    def histogramSummary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+
+PROFILER = Profiler()
+
+
+def profiled(name=None, category="editor"):
+    """
+    Decorator recording a span for every call while PROFILER is enabled.
+    """
+
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                PROFILER.record(label, start, time.perf_counter(), category)
+
+        return wrapper
+
+    return decorate
@@ -1,11 +1,15 @@
 import json
 import os
 import re
+from collections import Counter
 
 from PyQt6.QtCore import Qt, QObject, pyqtSignal
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTextBrowser, QPushButton, QLineEdit, QMessageBox
-from pyeasyedit.LexersCustom import *
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTextBrowser, QPushButton, QLineEdit, QMessageBox, QCheckBox, \
+    QListView
+from PyQt6.Qsci import QsciScintilla
+from pyeasyedit.search import FindAllThread, IncrementalSearch, MatchHighlighter, MatchListModel, compile_pattern, \
+    find_next, find_previous, replace_all, replace_match
 
 
 class ReplaceDialog(QDialog):
@@ -32,6 +36,17 @@ class ReplaceDialog(QDialog):
         self.replaceField = QLineEdit(self)
         layout.addWidget(self.replaceField)
 
+        # Search options
+        self.regexCheck = QCheckBox("Regular expression", self)
+        layout.addWidget(self.regexCheck)
+
+        self.caseCheck = QCheckBox("Match case", self)
+        self.caseCheck.setChecked(True)
+        layout.addWidget(self.caseCheck)
+
+        self.wordCheck = QCheckBox("Whole word", self)
+        layout.addWidget(self.wordCheck)
+
         # Find and Replace buttons
         self.findButton = QPushButton("Find Next", self)
         self.findButton.clicked.connect(self.findNext)
@@ -48,32 +63,69 @@ class ReplaceDialog(QDialog):
         self.findField.setFocus()
 
 
-    def findNext(self):
+    def findPattern(self):
+        # The same bytes regex Replace All uses, so all three buttons agree on the syntax
         text = self.findField.text()
-        if not self.editor.findFirst(text, False, True, False, True, True):
+        if not text:
+            return None
+        try:
+            return compile_pattern(text, self.regexCheck.isChecked(), self.caseCheck.isChecked(),
+                                   self.wordCheck.isChecked())
+        except re.error as e:
+            QMessageBox.warning(self, "Replace", f"Invalid regular expression: {e}")
+            return None
+
+    def findFrom(self, pattern, position):
+        span = find_next(self.editor, pattern, position)
+        if span is None:
             QMessageBox.information(self, "Find", "The text was not found.")
+        else:
+            self.editor.SendScintilla(self.editor.SCI_SETSEL, *span)
+        return span
+
+    def findNext(self):
+        pattern = self.findPattern()
+        if pattern is not None:
+            self.findFrom(pattern, self.editor.SendScintilla(self.editor.SCI_GETSELECTIONEND))
 
     def replace(self):
-        find_text = self.findField.text()
-        if self.editor.findFirst(find_text, False, True, False, True, True):
-            replace_text = self.replaceField.text()
-            self.editor.replace(replace_text)
+        # Replaces the selected match, or the next one, then moves on to the match after it
+        pattern = self.findPattern()
+        if pattern is None:
+            return
+        span = self.findFrom(pattern, self.editor.SendScintilla(self.editor.SCI_GETSELECTIONSTART))
+        if span is not None:
+            end = replace_match(self.editor, pattern, span, self.replaceField.text(), self.regexCheck.isChecked())
+            span = find_next(self.editor, pattern, end)
+            if span is not None:
+                self.editor.SendScintilla(self.editor.SCI_SETSEL, *span)
 
     def replaceAll(self):
         find_text = self.findField.text()
         replace_text = self.replaceField.text()
-        self.editor.SendScintilla(self.editor.SCI_DOCUMENTSTART)
-        found = self.editor.findFirst(find_text, False, True, False, True, True)
-        while found:
-            self.editor.replace(replace_text)
-            found = self.editor.findNext()
+        try:
+            count = replace_all(self.editor, find_text, replace_text, self.regexCheck.isChecked(),
+                                self.caseCheck.isChecked(), self.wordCheck.isChecked())
+        except re.error as e:
+            QMessageBox.warning(self, "Replace All", f"Invalid regular expression: {e}")
+            return
+        QMessageBox.information(self, "Replace All", f"Replaced {count} occurrence(s).")
 
 
 
 class SearchDialog(QDialog):
     def __init__(self, editor, parent=None):
         super().__init__(parent)
-        self.editor = editor  # Reference to the QsciScintilla editor
+        self.editor = editor  # Reference to the CustomQsciScintilla editor
+        self.matchIndex = None  # MatchIndex from the last Find All
+        self.indexKey = None  # Search text and options the index was built for
+        self.findThread = None
+        self.findGeneration = 0  # highlighter.generation when the Find All snapshot was taken
+        self.searchAnchor = 0  # Where as-you-type search looks for its first match
+        self.highlighter = MatchHighlighter(editor, self)
+        self.highlighter.invalidated.connect(self.onIndexInvalidated)
+        self.incrementalSearch = IncrementalSearch(editor, self)
+        self.incrementalSearch.finished.connect(self.onIncrementalFinished)
         self.initUI()
 
     def initUI(self):
@@ -84,21 +136,177 @@ class SearchDialog(QDialog):
         layout.addWidget(self.label)
 
         self.searchField = QLineEdit(self)
+        self.searchField.textChanged.connect(self.searchIncrementally)
         layout.addWidget(self.searchField)
 
+        # Search options
+        self.regexCheck = QCheckBox("Regular expression", self)
+        self.regexCheck.toggled.connect(self.searchIncrementally)
+        layout.addWidget(self.regexCheck)
+
+        self.caseCheck = QCheckBox("Match case", self)
+        self.caseCheck.setChecked(True)
+        self.caseCheck.toggled.connect(self.searchIncrementally)
+        layout.addWidget(self.caseCheck)
+
+        self.wordCheck = QCheckBox("Whole word", self)
+        self.wordCheck.toggled.connect(self.searchIncrementally)
+        layout.addWidget(self.wordCheck)
+
         self.searchButton = QPushButton("Find Next", self)
         self.searchButton.clicked.connect(self.findNext)
         layout.addWidget(self.searchButton)
 
+        self.previousButton = QPushButton("Find Previous", self)
+        self.previousButton.clicked.connect(self.findPrevious)
+        layout.addWidget(self.previousButton)
+
+        self.findAllButton = QPushButton("Find All", self)
+        self.findAllButton.clicked.connect(self.findAll)
+        layout.addWidget(self.findAllButton)
+
+        # Find All results, one row per match with a preview of its line
+        self.resultsModel = MatchListModel(self.editor, self)
+        self.resultsView = QListView(self)
+        self.resultsView.setModel(self.resultsModel)
+        self.resultsView.setUniformItemSizes(True)
+        self.resultsView.activated.connect(lambda index: self.selectMatch(index.row()))
+        self.resultsView.clicked.connect(lambda index: self.selectMatch(index.row()))
+        self.resultsView.hide()
+        layout.addWidget(self.resultsView)
+
         self.searchField.setFocus()
 
+    def searchKey(self):
+        return (self.searchField.text(), self.regexCheck.isChecked(), self.caseCheck.isChecked(),
+                self.wordCheck.isChecked())
+
+    def currentIndex(self):
+        # The Find All index, if it still matches what is in the search field
+        if self.matchIndex is not None and self.indexKey == self.searchKey():
+            return self.matchIndex
+        return None
+
+    def searchIncrementally(self):
+        text, regex, caseSensitive, wholeWord = key = self.searchKey()
+        self.matchIndex = None
+        self.highlighter.setIndex(None)
+        self.resultsModel.setIndex(None)
+        if not text:
+            self.incrementalSearch.cancel()
+            self.label.setText("Enter the text to search:")
+            return
+        try:
+            self.incrementalSearch.search(text, regex, caseSensitive, wholeWord)
+        except re.error as e:
+            self.incrementalSearch.cancel()
+            self.label.setText(f"Invalid regular expression: {e}")
+            return
+        self.indexKey = key
+        # Extending the text keeps the current match selected if it still matches
+        self.searchAnchor = self.editor.SendScintilla(self.editor.SCI_GETSELECTIONSTART)
+        self.label.setText("Searching...")
+
+    def onIncrementalFinished(self, index):
+        self.setMatchIndex(index)
+        if index:
+            self.selectMatch(index.nextFrom(self.searchAnchor))
+
+    def findAll(self):
+        self.resultsView.show()
+        if self.currentIndex() is not None:
+            return  # As-you-type search already indexed this text
+        text, regex, caseSensitive, wholeWord = key = self.searchKey()
+        if not text:
+            return
+        try:
+            pattern = compile_pattern(text, regex, caseSensitive, wholeWord)
+        except re.error as e:
+            self.label.setText(f"Invalid regular expression: {e}")
+            return
+
+        self.stopFindThread()
+        self.indexKey = key
+        self.findGeneration = self.highlighter.generation
+        self.findThread = FindAllThread(pattern, bytes(self.editor.documentBuffer()), self)
+        self.findThread.indexReady.connect(self.onIndexReady)
+        self.findThread.start()
+        self.label.setText("Searching...")
+
+    def onIndexReady(self, index):
+        if self.sender() is not self.findThread or self.indexKey != self.searchKey():
+            return  # Superseded by a newer search
+        if self.highlighter.generation != self.findGeneration:
+            # Edited while the snapshot was scanned, the offsets are stale
+            self.findThread = None
+            self.findAll()
+            return
+        self.setMatchIndex(index)
+
+    def setMatchIndex(self, index):
+        self.matchIndex = index
+        self.resultsModel.setIndex(index)
+        self.highlighter.setIndex(index)
+        self.label.setText(f"{len(index)} match(es) found." if index else "Text not found.")
+
+    def onIndexInvalidated(self):
+        self.matchIndex = None
+        self.resultsModel.setIndex(None)
+        self.label.setText("The document changed, use Find All again to refresh the results.")
+
+    def selectMatch(self, i):
+        start, end = self.matchIndex.span(i)
+        self.editor.SendScintilla(self.editor.SCI_SETSEL, start, end)
+        self.label.setText(f"Match {i + 1} of {len(self.matchIndex)}")
+
     def findNext(self):
-        text = self.searchField.text()
-        if not self.editor.findFirst(text, False, True, False, True, True):
-            # If nothing is found, wrap the search to the beginning
-            self.editor.SendScintilla(self.editor.SCI_DOCUMENTSTART)
-            if not self.editor.findFirst(text, False, True, False, True, True):
-                self.label.setText("Text not found.")
+        index = self.currentIndex()
+        if index is not None:
+            if index:
+                self.selectMatch(index.nextFrom(self.editor.SendScintilla(self.editor.SCI_GETSELECTIONEND)))
+            return
+        self.findFrom(find_next, self.editor.SendScintilla(self.editor.SCI_GETSELECTIONEND))
+
+    def findPrevious(self):
+        index = self.currentIndex()
+        if index is not None:
+            if index:
+                self.selectMatch(index.previousBefore(self.editor.SendScintilla(self.editor.SCI_GETSELECTIONSTART)))
+            return
+        self.findFrom(find_previous, self.editor.SendScintilla(self.editor.SCI_GETSELECTIONSTART))
+
+    def findFrom(self, find, position):
+        # No index to step through, search the buffer with the same bytes regex as Find All
+        text, regex, caseSensitive, wholeWord = self.searchKey()
+        if not text:
+            return
+        try:
+            pattern = compile_pattern(text, regex, caseSensitive, wholeWord)
+        except re.error as e:
+            self.label.setText(f"Invalid regular expression: {e}")
+            return
+        span = find(self.editor, pattern, position)
+        if span is None:
+            self.label.setText("Text not found.")
+        else:
+            self.editor.SendScintilla(self.editor.SCI_SETSEL, *span)
+
+    def stopFindThread(self):
+        if self.findThread is not None:
+            self.findThread.cancel()
+            self.findThread.wait()
+            self.findThread = None
+
+    def done(self, result):
+        # Closing, Escape and reject all end here
+        self.stopFindThread()
+        self.incrementalSearch.detach()
+        self.highlighter.detach()
+        super().done(result)
+
+
+# Regex to find simple imports and from-imports
+IMPORT_PATTERN = re.compile(r'^\s*import\s+(\S+)|^\s*from\s+(\S+)\s+import', re.MULTILINE)
 
 
 def get_imported_modules(code):
@@ -106,27 +314,101 @@ def get_imported_modules(code):
     Extracts all imported module names from the given code using regex.
     """
     module_names = set()
-    # Regex to find simple imports and from-imports
-    imports = re.findall(r'^\s*import\s+(\S+)|^\s*from\s+(\S+)\s+import', code, re.MULTILINE)
+    imports = IMPORT_PATTERN.findall(code)
     for imp in imports:
         # Add both groups (import and from-import cases)
         module_names.update([i for i in imp if i])
     return list(module_names)
 
 
+class ImportIndex:
+    """
+    Keeps the set of modules imported by a CustomQsciScintilla's document up to date
+    from Scintilla's modification notifications, rescanning only the lines an edit
+    touched instead of the whole text.
+    """
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.lineModules = [None] * editor.lines()  # Module imported on each line, or None
+        self.moduleCounts = Counter()
+        for line in range(len(self.lineModules)):
+            self.rescanLine(line)
+        editor.SCN_MODIFIED.connect(self.onModified)
+
+    def onModified(self, position, modificationType, text, length, linesAdded, *args):
+        if not modificationType & (QsciScintilla.SC_MOD_INSERTTEXT | QsciScintilla.SC_MOD_DELETETEXT):
+            return
+
+        first_line = self.editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, position)
+        if linesAdded > 0:
+            self.lineModules[first_line + 1:first_line + 1] = [None] * linesAdded
+        elif linesAdded < 0:
+            removed = self.lineModules[first_line + 1:first_line + 1 - linesAdded]
+            del self.lineModules[first_line + 1:first_line + 1 - linesAdded]
+            for module in removed:
+                if module:
+                    self.forget(module)
+
+        for line in range(first_line, first_line + max(linesAdded, 0) + 1):
+            self.rescanLine(line)
+
+    def rescanLine(self, line):
+        match = IMPORT_PATTERN.match(self.editor.lineWindow(line))
+        module = (match.group(1) or match.group(2)) if match else None
+        previous = self.lineModules[line]
+        if module == previous:
+            return
+        self.lineModules[line] = module
+        if previous:
+            self.forget(previous)
+        if module:
+            self.moduleCounts[module] += 1
+
+    def forget(self, module):
+        self.moduleCounts[module] -= 1
+        if self.moduleCounts[module] <= 0:
+            del self.moduleCounts[module]
+
+    def modules(self):
+        return list(self.moduleCounts)
+
+
+# Lexers are referred to by class name, LexersCustom is only imported when a
+# file first needs highlighting (see create_lexer) rather than at startup
 LEXER_MAP_MENU = {
-    "Python": CustomPythonLexer,
-    "JSON": CustomJSONLexer,
-    "JavaScript": CustomJavaScriptLexer,
-    "YAML": CustomYAMLLexer,
-    "HTML": CustomHTMLLexer,
-    "CSS": CustomCSSLexer,
-    "SQL": CustomSQLLexer,
-    "XML": CustomXMLLexer,
-    "Bash": CustomBashLexer,
-    "Batch": CustomBatchLexer
+    "Python": "CustomPythonLexer",
+    "JSON": "CustomJSONLexer",
+    "JavaScript": "CustomJavaScriptLexer",
+    "YAML": "CustomYAMLLexer",
+    "HTML": "CustomHTMLLexer",
+    "CSS": "CustomCSSLexer",
+    "SQL": "CustomSQLLexer",
+    "XML": "CustomXMLLexer",
+    "Bash": "CustomBashLexer",
+    "Batch": "CustomBatchLexer"
+}
+
+LEXER_MAP_EXTENSIONS = {
+    '.py': "CustomPythonLexer",
+    '.json': "CustomJSONLexer",
+    '.js': "CustomJavaScriptLexer",
+    '.yaml': "CustomYAMLLexer", '.yml': "CustomYAMLLexer",
+    '.html': "CustomHTMLLexer", '.htm': "CustomHTMLLexer",
+    '.css': "CustomCSSLexer",
+    '.sql': "CustomSQLLexer",
+    '.xml': "CustomXMLLexer",
+    '.sh': "CustomBashLexer",
+    '.bat': "CustomBatchLexer",
 }
 
+
+def create_lexer(name, parent=None):
+    # Styled from the current theme's cached table, see themes.py
+    from pyeasyedit import LexersCustom
+    return getattr(LexersCustom, name)(parent)
+
+
 GLOBAL_COLOR_SCHEME = {
     "Keyword": "#FFC66D",
     "Comment": "#367d36",
@@ -141,6 +423,8 @@ GLOBAL_COLOR_SCHEME = {
 class SignalEmitter(QObject):
     completionsFetched = pyqtSignal(object)  # Use the correct data type for your completions
     errorOccurred = pyqtSignal(str)
+    workerFinished = pyqtSignal(object)
+    environmentReady = pyqtSignal()
 
 
 class HotkeysDialog(QDialog):
@@ -169,11 +453,7 @@ class HotkeysDialog(QDialog):
         layout.addWidget(closeButton)
 
 def save_recent_files(file_list, max_files=5):
-    config_directory = get_config_directory()
-    config_path = os.path.join(config_directory, "config.json")
-    data = {"recent_files": file_list[:max_files]}  # Store only the most recent entries
-    with open(config_path, "w") as config_file:
-        json.dump(data, config_file)
+    save_settings({"recent_files": file_list[:max_files]})  # Store only the most recent entries
 
 
 def load_recent_files():
@@ -186,6 +466,26 @@ def load_recent_files():
     except FileNotFoundError:
         return []
 
+def load_settings():
+    config_directory = get_config_directory()
+    config_path = os.path.join(config_directory, "config.json")
+    try:
+        with open(config_path, "r") as config_file:
+            return json.load(config_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_settings(values):
+    # Merge into config.json so settings and recent files don't overwrite each other
+    config_directory = get_config_directory()
+    config_path = os.path.join(config_directory, "config.json")
+    data = load_settings()
+    data.update(values)
+    with open(config_path, "w") as config_file:
+        json.dump(data, config_file)
+
+
 def get_config_directory():
     home = os.path.expanduser("~")  # Gets the user's home directory universally
     config_directory = os.path.join(home, ".pyeasyedit")
@@ -202,7 +502,6 @@ class AboutDialog(QDialog):
 
         # Display the image
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        print(f"current dir: {base_dir}")
         image_path = os.path.join(base_dir, './images/easyedit.png')
 
         self.imageLabel = QLabel(self)
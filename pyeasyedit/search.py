@@ -0,0 +1,476 @@
+"""
+Search and replace over the editor's UTF-8 buffer.
+
+Patterns are compiled to bytes regexes and run directly against the document's
+memoryview, so match offsets are Scintilla positions and no text is copied.
+Case-insensitive and whole-word matching follow bytes regex rules, which only
+treat ASCII letters as word characters.
+"""
+import re
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QThread, QTimer, pyqtSignal
+from PyQt6.Qsci import QsciScintilla
+
+FIND_INDICATOR = 8  # First indicator number reserved for containers
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(text, regex=False, caseSensitive=True, wholeWord=False):
+    """
+    Compiles the search text into a bytes regex. Raises re.error for a bad regex.
+    Cached, as-you-type search compiles the same few patterns over and over.
+    """
+    pattern = text.encode("utf-8")
+    if not regex:
+        pattern = re.escape(pattern)
+    if wholeWord:
+        pattern = rb"(?<!\w)(?:" + pattern + rb")(?!\w)"
+    flags = re.MULTILINE
+    if not caseSensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=32)
+def occurrence_pattern(text, caseSensitive=True):
+    # Zero-width lookahead, so finditer yields every start of text including overlapping ones
+    flags = re.MULTILINE if caseSensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(rb"(?=" + re.escape(text.encode("utf-8")) + rb")", flags)
+
+
+class ReplacementExpander:
+    """
+    Expands group references in a regex replacement for matches found in the
+    document buffer. Match.expand needs a bytes subject, so each match is found
+    again in a copy of its lines and the lines either side. Only if a lookaround
+    reaches past that window and the match comes out different is the whole
+    document copied, once.
+    """
+
+    def __init__(self, editor, buffer, pattern, replacement):
+        self.editor = editor
+        self.buffer = buffer  # editor.documentBuffer(), valid until the next edit
+        self.pattern = pattern
+        self.replacement = replacement
+        self.document = None
+
+    def expand(self, start, end):
+        editor = self.editor
+        first_line = max(0, editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, start) - 1)
+        last_line = min(editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, end) + 1,
+                        editor.SendScintilla(QsciScintilla.SCI_GETLINECOUNT) - 1)
+        window_start = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, first_line)
+        window_end = editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, last_line)
+        match = self.pattern.match(bytes(self.buffer[window_start:window_end]), start - window_start)
+        if match is None or match.span() != (start - window_start, end - window_start):
+            if self.document is None:
+                self.document = bytes(self.buffer)
+            match = self.pattern.match(self.document, start)
+        return match.expand(self.replacement)
+
+
+def find_matches(editor, pattern, replacement=None, regex=False):
+    """
+    Returns [(start, end, replacement_bytes)] for every match in the document, in
+    order. Regex replacements may use group references.
+    """
+    replacement = (replacement or "").encode("utf-8")
+    buffer = editor.documentBuffer()
+    if regex and b"\\" in replacement:
+        expander = ReplacementExpander(editor, buffer, pattern, replacement)
+        return [(match.start(), match.end(), expander.expand(*match.span())) for match in pattern.finditer(buffer)]
+    return [(match.start(), match.end(), replacement) for match in pattern.finditer(buffer)]
+
+
+def apply_replacements(editor, matches):
+    """
+    Applies all matches as one edit. The text from the first match to the last is
+    rebuilt with the replacements spliced in and swapped in with a single
+    SCI_REPLACETARGET, so the whole operation is one undo step and one
+    modification notification.
+
+    Per-match edits would be quadratic here, QScintilla's SCN_MODIFIED handling
+    costs time proportional to the edit position, and undoing them replays that.
+    """
+    if not matches:
+        return 0
+    first, last = matches[0][0], matches[-1][1]
+    buffer = editor.rangeBuffer(first, last)
+    pieces = []
+    position = first
+    for start, end, replacement in matches:
+        pieces.append(buffer[position - first:start - first])
+        pieces.append(replacement)
+        position = end
+    text = b"".join(pieces)
+    del buffer, pieces
+
+    editor.setUpdatesEnabled(False)
+    try:
+        editor.SendScintilla(QsciScintilla.SCI_SETTARGETRANGE, first, last)
+        editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(text), text)
+    finally:
+        editor.setUpdatesEnabled(True)
+    return len(matches)
+
+
+def replace_all(editor, text, replacement, regex=False, caseSensitive=True, wholeWord=False):
+    """
+    Replaces every occurrence of text in one pass and returns the number replaced.
+    """
+    if not text:
+        return 0
+    pattern = compile_pattern(text, regex, caseSensitive, wholeWord)
+    return apply_replacements(editor, find_matches(editor, pattern, replacement, regex))
+
+
+def find_next(editor, pattern, position):
+    """
+    Returns (start, end) of the first non-empty match at or after position,
+    wrapping round to the start of the document, or None if there is none.
+    """
+    buffer = editor.documentBuffer()
+    for match in pattern.finditer(buffer, position):
+        if match.end() > match.start():
+            return match.span()
+    for match in pattern.finditer(buffer):
+        if match.start() >= position:
+            break
+        if match.end() > match.start():
+            return match.span()
+    return None
+
+
+def find_previous(editor, pattern, position):
+    """
+    Returns (start, end) of the last non-empty match starting before position,
+    wrapping round to the last match in the document, or None if there is none.
+    """
+    last = None
+    for match in pattern.finditer(editor.documentBuffer()):
+        if match.end() == match.start():
+            continue
+        if match.start() >= position and last is not None and last[0] < position:
+            break
+        last = match.span()
+    return last
+
+
+def replace_match(editor, pattern, span, replacement, regex=False):
+    """
+    Replaces the match at span, with group references expanded as in
+    find_matches, and returns the position after the inserted text.
+    """
+    start, end = span
+    replacement = replacement.encode("utf-8")
+    if regex and b"\\" in replacement:
+        replacement = ReplacementExpander(editor, editor.documentBuffer(), pattern, replacement).expand(start, end)
+    editor.SendScintilla(QsciScintilla.SCI_SETTARGETRANGE, start, end)
+    editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(replacement), replacement)
+    return start + len(replacement)
+
+
+class MatchIndex:
+    """
+    Sorted start and end offsets of every match in a document snapshot. Navigation
+    and visible-range highlighting bisect into it instead of searching again.
+    """
+
+    def __init__(self, starts=None, ends=None):
+        self.starts = starts if starts is not None else array("q")
+        self.ends = ends if ends is not None else array("q")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def span(self, i):
+        return self.starts[i], self.ends[i]
+
+    def nextFrom(self, position):
+        # First match starting at or after position, wrapping to the first match
+        if not self.starts:
+            return None
+        i = bisect_left(self.starts, position)
+        return i if i < len(self.starts) else 0
+
+    def previousBefore(self, position):
+        # Last match starting before position, wrapping to the last match
+        if not self.starts:
+            return None
+        return (bisect_left(self.starts, position) - 1) % len(self.starts)
+
+    def between(self, start, end):
+        return range(bisect_left(self.starts, start), bisect_left(self.starts, end))
+
+
+def scan(pattern, data, isCancelled=None):
+    """
+    Builds a MatchIndex of pattern over data, skipping empty matches. Returns None
+    if isCancelled() turns true part way through.
+    """
+    index = MatchIndex()
+    for count, match in enumerate(pattern.finditer(data)):
+        if count % 4096 == 0 and isCancelled is not None and isCancelled():
+            return None
+        start, end = match.span()
+        if end > start:
+            index.starts.append(start)
+            index.ends.append(end)
+    return index
+
+
+class FindAllThread(QThread):
+    """
+    Scans a bytes snapshot of the document off the UI thread. The snapshot is one
+    copy of the buffer, the live buffer could move under a background reader.
+    """
+    indexReady = pyqtSignal(object)  # MatchIndex
+
+    def __init__(self, pattern, data, parent=None):
+        super().__init__(parent)
+        self.pattern = pattern
+        self.data = data
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            index = scan(self.pattern, self.data, lambda: self.cancelled)
+        finally:
+            self.data = None
+        if index is not None:
+            self.indexReady.emit(index)
+
+
+class MatchHighlighter(QObject):
+    """
+    Marks matches from a MatchIndex with an indicator, only over the lines on
+    screen, and repaints as the view scrolls. Any edit makes the index stale, so
+    highlights are dropped and invalidated is emitted. generation counts the
+    edits, so an index scanned from an older snapshot can be told apart.
+    """
+    invalidated = pyqtSignal()
+
+    def __init__(self, editor, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.index = None
+        self.painted = None  # (start, end) range currently carrying indicators
+        self.generation = 0
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETSTYLE, FIND_INDICATOR, QsciScintilla.INDIC_ROUNDBOX)
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETFORE, FIND_INDICATOR, 0x00B4FF)  # BGR, orange
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETALPHA, FIND_INDICATOR, 90)
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETUNDER, FIND_INDICATOR, True)
+        editor.SCN_UPDATEUI.connect(self.onUpdateUi)
+        editor.SCN_MODIFIED.connect(self.onModified)
+
+    def setIndex(self, index):
+        self.index = index
+        self.paint()
+
+    def visibleRange(self):
+        editor = self.editor
+        first_visible = editor.SendScintilla(QsciScintilla.SCI_GETFIRSTVISIBLELINE)
+        last_visible = first_visible + editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN) + 1
+        first_line = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, first_visible)
+        last_line = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, last_visible)
+        return (editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, first_line),
+                editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, last_line))
+
+    def paint(self):
+        editor = self.editor
+        editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, FIND_INDICATOR)
+        if self.painted is not None:
+            start, end = self.painted
+            editor.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, start, end - start)
+            self.painted = None
+        if not self.index:
+            return
+        start, end = self.visibleRange()
+        painted_end = end
+        for i in self.index.between(start, end):
+            match_start, match_end = self.index.span(i)
+            editor.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE, match_start, match_end - match_start)
+            painted_end = max(painted_end, match_end)  # A match may run past the last visible line
+        self.painted = (start, painted_end)
+
+    def onUpdateUi(self, updated):
+        if self.index and updated & (QsciScintilla.SC_UPDATE_V_SCROLL | QsciScintilla.SC_UPDATE_H_SCROLL):
+            self.paint()
+
+    def onModified(self, position, modificationType, *args):
+        if not modificationType & (QsciScintilla.SC_MOD_INSERTTEXT | QsciScintilla.SC_MOD_DELETETEXT):
+            return
+        self.generation += 1
+        if self.index is not None:
+            # The edit has already happened, clear the whole document rather than a shifted range
+            self.index = None
+            self.painted = (0, self.editor.SendScintilla(QsciScintilla.SCI_GETLENGTH))
+            self.paint()
+            self.invalidated.emit()
+
+    def detach(self):
+        if self.editor is None:
+            return
+        self.setIndex(None)
+        self.editor.SCN_UPDATEUI.disconnect(self.onUpdateUi)
+        self.editor.SCN_MODIFIED.disconnect(self.onModified)
+        self.editor = None
+
+
+class MatchListModel(QAbstractListModel):
+    """
+    One row per match. Previews are read from the editor only for the rows the
+    view asks for, so a million matches cost nothing until they are scrolled to.
+    """
+
+    def __init__(self, editor, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.matches = MatchIndex()
+
+    def setIndex(self, index):
+        self.beginResetModel()
+        self.matches = index if index is not None else MatchIndex()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.matches)
+
+    def data(self, modelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not modelIndex.isValid():
+            return None
+        start = self.matches.starts[modelIndex.row()]
+        line = self.editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, start)
+        return f"{line + 1}: {self.editor.lineWindow(line).strip()[:200]}"
+
+
+class IncrementalSearch(QObject):
+    """
+    As-you-type search over the live buffer, time-sliced on a zero interval timer
+    so typing is never blocked. The document is scanned in slices that end on a
+    newline, so in regex mode a match spanning a slice boundary is missed; Find
+    All gives the exact answer.
+
+    Plain searches keep every (overlapping) start of the search text. When the
+    new text extends the previous one, every new match starts at one of those,
+    so only they are rechecked, and the part of the document the previous search
+    had not reached yet is scanned with the new text.
+    """
+    finished = pyqtSignal(object)  # MatchIndex
+
+    SLICE_BYTES = 256 * 1024
+    TIME_BUDGET = 0.008  # Seconds of scanning per timer tick
+
+    def __init__(self, editor, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.step)
+        self.newlinePattern = re.compile(rb"\n")
+        self.key = None
+        self.reset()
+        editor.SCN_MODIFIED.connect(self.onModified)
+
+    def reset(self):
+        self.candidates = array("q")  # Occurrences of the previous text still to recheck
+        self.candidatePos = 0
+        self.occurrences = array("q")  # Every start of the current text found so far
+        self.scanned = 0  # Document offset scanned up to
+        self.index = MatchIndex()
+        self.lastEnd = 0
+
+    def isRunning(self):
+        return self.timer.isActive()
+
+    def search(self, text, regex=False, caseSensitive=True, wholeWord=False):
+        """
+        Starts searching for text, reusing the previous search where possible.
+        Raises re.error for a bad regex. Results arrive through finished.
+        """
+        pattern = compile_pattern(text, regex, caseSensitive, wholeWord)
+        previous = self.key
+        self.timer.stop()
+        if (previous is not None and not regex and not previous[1] and previous[2] == caseSensitive
+                and previous[0] and text.startswith(previous[0])):
+            scanned = self.scanned
+            # Starts of the previous text, plus any older candidates it had not rechecked yet
+            candidates = self.occurrences + self.candidates[self.candidatePos:]
+            self.reset()
+            self.candidates = candidates
+            self.scanned = scanned
+        else:
+            self.reset()
+        self.key = (text, regex, caseSensitive, wholeWord)
+        self.pattern = pattern
+        self.occurrencePattern = None if regex else occurrence_pattern(text, caseSensitive)
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
+        self.key = None
+
+    def addOccurrence(self, data, position):
+        self.occurrences.append(position)
+        if position >= self.lastEnd:
+            # Keep only the matches finditer would give, they cannot overlap
+            match = self.pattern.match(data, position)
+            if match is not None and match.end() > position:
+                self.addMatch(position, match.end())
+
+    def addMatch(self, start, end):
+        self.index.starts.append(start)
+        self.index.ends.append(end)
+        self.lastEnd = end
+
+    def step(self):
+        data = self.editor.documentBuffer()
+        deadline = time.perf_counter() + self.TIME_BUDGET
+
+        # Recheck where the previous text occurred
+        while self.candidatePos < len(self.candidates):
+            stop = min(self.candidatePos + 4096, len(self.candidates))
+            for position in self.candidates[self.candidatePos:stop]:
+                if self.occurrencePattern.match(data, position):
+                    self.addOccurrence(data, position)
+            self.candidatePos = stop
+            if time.perf_counter() > deadline:
+                return
+
+        # Then scan the rest of the document
+        length = len(data)
+        while self.scanned < length:
+            newline = self.newlinePattern.search(data, self.scanned + self.SLICE_BYTES)
+            end = newline.end() if newline else length
+            if self.occurrencePattern is not None:
+                for match in self.occurrencePattern.finditer(data, self.scanned, end):
+                    self.addOccurrence(data, match.start())
+            else:
+                for match in self.pattern.finditer(data, self.scanned, end):
+                    if match.end() > match.start():
+                        self.addMatch(match.start(), match.end())
+            self.scanned = end
+            if time.perf_counter() > deadline:
+                return
+
+        self.timer.stop()
+        self.finished.emit(self.index)
+
+    def onModified(self, position, modificationType, *args):
+        if not modificationType & (QsciScintilla.SC_MOD_INSERTTEXT | QsciScintilla.SC_MOD_DELETETEXT):
+            return
+        # Offsets found so far are no longer valid, start over for the same text
+        self.reset()
+        if not self.isRunning():
+            self.key = None
+
+    def detach(self):
+        self.cancel()
+        self.editor.SCN_MODIFIED.disconnect(self.onModified)
@@ -0,0 +1,41 @@
+"""
+Session persistence.
+
+The open tabs are saved to session.json in the config directory when the editor
+closes, each with its cursor, scroll position, folds and lexer. The next start
+gives every tab a placeholder, loads the active one and reads the rest in
+parallel behind it (see EditorWidget.restoreSession).
+"""
+import json
+import os
+
+from pyeasyedit.fileio import atomic_write
+from pyeasyedit.pyeasylib import get_config_directory
+
+SESSION_FILE = "session.json"
+SESSION_VERSION = 1
+
+
+def session_path():
+    return os.path.join(get_config_directory(), SESSION_FILE)
+
+
+def load_session():
+    # An unreadable or older session is treated as no session at all
+    try:
+        with open(session_path(), "r", encoding="utf-8") as session_file:
+            session = json.load(session_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(session, dict) or session.get("version") != SESSION_VERSION:
+        return {}
+    return session
+
+
+def save_session(tabs, current=0):
+    """
+    Saves tabs, a list of {"path": ..., "view": view state} in tab order, with
+    current the index of the active one.
+    """
+    data = json.dumps({"version": SESSION_VERSION, "current": current, "tabs": tabs}, indent=1)
+    atomic_write(session_path(), data.encode("utf-8"))
@@ -0,0 +1,106 @@
+"""
+Single-instance support over a local socket.
+
+A second launch connects to the running editor's QLocalServer, hands over the
+files it was asked to open and exits. Only QtCore and QtNetwork are imported,
+so the forwarding path never pays for the widgets, QScintilla or Jedi.
+"""
+import getpass
+import hashlib
+import json
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT_MS = 200
+REPLY_TIMEOUT_MS = 1000
+
+
+def server_name():
+    # One instance per user and per home directory
+    key = f"{getpass.getuser()}:{os.path.expanduser('~')}"
+    return "pyeasyedit-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def send_to_running_instance(files, name=None):
+    """
+    Asks a running instance to open files. Returns True if one acknowledged the
+    request, False if there is none (or it did not answer), in which case the
+    caller should start the editor itself.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.write((json.dumps({"files": files}) + "\n").encode("utf-8"))
+    if not socket.waitForBytesWritten(REPLY_TIMEOUT_MS):
+        return False
+    acknowledged = False
+    while socket.waitForReadyRead(REPLY_TIMEOUT_MS):
+        if bytes(socket.readAll()).startswith(b"ok"):
+            acknowledged = True
+            break
+    socket.disconnectFromServer()
+    return acknowledged
+
+
+class InstanceServer(QObject):
+    """
+    Listens for later launches and emits filesRequested with the paths they
+    forward.
+    """
+    filesRequested = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.onNewConnection)
+        self.buffers = {}
+
+    def listen(self, name=None):
+        """
+        Returns True if this process is now the single instance, False if another
+        instance already answers on the socket. A socket left behind by a crashed
+        instance is removed first.
+        """
+        name = name or server_name()
+        # Probe before listening, with socket options set Qt replaces an existing
+        # Unix socket instead of failing with AddressInUseError
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(name)
+        return self.server.listen(name)
+
+    def onNewConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self.onReadyRead(socket))
+            socket.disconnected.connect(lambda socket=socket: self.onDisconnected(socket))
+
+    def onReadyRead(self, socket):
+        self.buffers[socket] += bytes(socket.readAll())
+        if b"\n" not in self.buffers[socket]:
+            return
+        line = self.buffers[socket].split(b"\n", 1)[0]
+        self.buffers[socket] = b""
+        try:
+            files = json.loads(line.decode("utf-8")).get("files", [])
+        except (ValueError, AttributeError):
+            files = None
+        socket.write(b"ok\n" if files is not None else b"error\n")
+        socket.flush()
+        if files is not None:
+            self.filesRequested.emit([str(path) for path in files])
+
+    def onDisconnected(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def close(self):
+        self.server.close()
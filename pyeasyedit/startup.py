@@ -0,0 +1,45 @@
+"""
+Staged startup.
+
+The window is shown and painted before anything that is not needed to draw it.
+Jedi, the lexer classes, the Jedi environment and the files named on the
+command line are all loaded after the first paint, or after
+FIRST_PAINT_FALLBACK_MS if the window never paints, e.g. when it starts
+minimized. FirstPaintWatcher reports
+when that paint happens, so time to first paint can be checked against
+FIRST_PAINT_TARGET_MS (python -m pyeasyedit --startup-time).
+"""
+import time
+
+from PyQt6.QtCore import QCoreApplication, QEvent, QObject, QTimer, pyqtSignal
+
+FIRST_PAINT_TARGET_MS = 400  # From launch to the first frame of the window
+FIRST_PAINT_FALLBACK_MS = 750  # Startup goes ahead anyway if no paint has been seen by then
+
+
+class FirstPaintWatcher(QObject):
+    """
+    Emits painted(milliseconds) once, after the first paint of any widget in
+    window. The signal is queued so slots run after that frame has been drawn.
+    """
+    painted = pyqtSignal(float)
+
+    def __init__(self, window, launchTime=None, parent=None):
+        super().__init__(parent)
+        self.window = window
+        self.launchTime = launchTime if launchTime is not None else time.perf_counter()
+        self.elapsedMs = None
+        # The window itself may be covered by its children, so watch every widget
+        # until the first paint and then step aside
+        QCoreApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and self.elapsedMs is None and watched.isWidgetType() \
+                and watched.window() is self.window:
+            self.elapsedMs = (time.perf_counter() - self.launchTime) * 1000
+            QCoreApplication.instance().removeEventFilter(self)
+            QTimer.singleShot(0, lambda: self.painted.emit(self.elapsedMs))
+        return False
+
+    def withinTarget(self):
+        return self.elapsedMs is not None and self.elapsedMs <= FIRST_PAINT_TARGET_MS
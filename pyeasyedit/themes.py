@@ -0,0 +1,361 @@
+"""
+Themes: editor colours, fonts and syntax colours per language.
+
+A theme is a JSON-shaped dict; user themes are JSON files in
+~/.pyeasyedit/themes, named after the file, and only need the keys they change
+from the built-in Dark theme. compile_theme turns a definition into a
+CompiledTheme holding ready QColor and QFont objects. A lexer's style table is
+resolved by style name once per lexer class and theme, on a pristine lexer,
+and then copied onto every lexer of that class, including lexers that are
+already attached to an editor when the theme changes.
+"""
+import copy
+import json
+import logging
+import os
+
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.Qsci import QsciLexer, QsciScintillaBase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THEME = "Dark"
+THEMES_DIRECTORY = "themes"  # Under the config directory
+
+
+# Define the global color scheme
+GLOBAL_COLOR_SCHEME = {
+    "Keyword": "#f5ec40",  # Brighter yellow
+    "Comment": "#6C9E6E",  # Lighter green
+    "Operator": "#55FF75",  # Brighter green
+    "ClassName": "#FFF0AC",  # Brighter cream
+    "FunctionMethodName": "#e1a1ff",  # Lighter purple
+    "TripleSingleQuotedString": "#6AB0CF",  # Lighter blue-green
+    "TripleDoubleQuotedString": "#6AB0CF",  # Lighter blue-green
+    "SingleQuotedString": "#6AB0CF",  # Lighter blue-green
+    "DoubleQuotedString": "#6AB0CF",  # Lighter blue-green
+}
+HTML_JS_DARK_COLOR_SCHEME = {
+    # HTML styles
+    "Default": "#c8c8c8",
+    "Tag": "#f5ec40",
+    "UnknownTag": "#ff6347",
+    "Attribute": "#ffd700",
+    "UnknownAttribute": "#ff6347",
+    "HTMLNumber": "#dcdcaa",
+    "HTMLDoubleQuotedString": "#ce9178",
+    "HTMLSingleQuotedString": "#ce9178",
+    "OtherInTag": "#d7ba7d",
+    "HTMLComment": "#608b4e",
+    "Entity": "#569cd6",
+    # JavaScript styles
+    "JavaScriptDefault": "#dcdcaa",
+    "JavaScriptComment": "#608b4e",
+    "JavaScriptCommentDoc": "#608b4e",
+    "JavaScriptCommentLine": "#608b4e",
+    "JavaScriptNumber": "#b5cea8",
+    "JavaScriptWord": "#569cd6",
+    "JavaScriptKeyword": "#c586c0",
+    "JavaScriptDoubleQuotedString": "#ce9178",
+    "JavaScriptSingleQuotedString": "#ce9178",
+    "JavaScriptSymbol": "#dcdcaa",
+    "JavaScriptUnclosedString": "#ce9178",
+    "JavaScriptRegex": "#d16969",
+    # ... other styles as needed
+}
+
+JAVASCRIPT_DARK_COLOR_SCHEME = {
+    "Default": "#D4D4D4",  # Light grey for default text
+    "Comment": "#57A64A",  # Green for comments
+    "CommentDoc": "#57A64A",  # Green for documentation comments
+    "CommentLine": "#57A64A",  # Green for line comments
+    "CommentLineDoc": "#57A64A",  # Green for line doc comments
+    "Keyword": "#f08e1f",  # orange for keywords
+    "Number": "#B5CEA8",  # Light green for numbers
+    "Operator": "#f5de0c",  # Grey for operators
+    "Regex": "#D16969",  # Red for regular expressions
+    "Identifier": "#ffffff",  # Light blue for identifiers
+    "GlobalClass": "#4EC9B0",  # Turquoise for global classes
+    # ... other styles as needed
+    # Inactive styles are used when a part of the text is out of focus or inactive.
+    # You can set them to a slightly dimmed color compared to the active ones.
+    "InactiveDefault": "#808080",  # Dimmed grey
+    "InactiveComment": "#408040",  # Dimmed green
+    "InactiveKeyword": "#3A6DA2",  # Dimmed blue
+    "DoubleQuotedString": "#f08e1f",  # Orange for double-quoted strings
+    "SingleQuotedString": "#f08e1f",  # Orange for single-quoted strings
+
+    # ... and so on for inactive styles
+}
+
+
+CUSTOM_JSON_COLOR_SCHEME = {
+    "Default": "#ffffff",  # white
+    "Number": "#ff4500",  # orange red
+    "String": "#ffa500",  # orange
+    "UnclosedString": "#ff6347",  # tomato
+    "Property": "#1e90ff",  # dodger blue
+    "EscapeSequence": "#20b2aa",  # light sea green
+    "LineComment": "#008000",  # green
+    "BlockComment": "#008000",  # green (same as line comment for consistency)
+    "Operator": "#b22222",  # firebrick
+    "IRI": "#4b0082",  # indigo
+    "JSON-LDCompactIRI": "#da70d6",  # orchid
+    "JSONKeyword": "#0000cd",  # medium blue
+    "JSON-LDKeyword": "#b03060",  # maroon
+    "ParsingError": "#ff0000"  # red
+}
+
+
+CUSTOM_YAML_COLOR_SCHEME = {
+    "Default": "#dcdcdc",  # Light gray
+    "Comment": "#00ff00",  # Bright green
+    "Identifier": "#1e90ff",  # Dodger blue
+    "Keyword": "#ff4500",  # Orange red
+    "Number": "#ff6347",  # Tomato
+    "Reference": "#4682b4",  # Steel blue
+    "DocumentDelimiter": "#ffffff",  # White
+    "TextBlockMarker": "#8a2be2",  # Blue violet
+    "SyntaxErrorMarker": "#ff0000",  # Red
+    "Operator": "#b22222"  # Firebrick
+}
+
+
+def language_scheme(scheme):
+    # A language's own entries, the ones the global scheme does not override
+    return {name: color for name, color in scheme.items() if name not in GLOBAL_COLOR_SCHEME}
+
+
+DARK_THEME = {
+    "editor": {
+        "margins_background": "#333333",
+        "margins_foreground": "#CCCCCC",
+        "fold_margin": ["#555555", "#333333"],
+        "caret_foreground": "#FFFFFF",
+        "caret_line_background": "#555555",
+        "matched_brace_background": "#006600",
+        "matched_brace_foreground": "#FFFFFF",
+        "unmatched_brace_background": "#660000",
+        "unmatched_brace_foreground": "#FFFFFF",
+        # Files without a lexer
+        "text": "#000000",
+        "paper": "#ffffff",
+        "font": "Consolas",
+        "font_size": 10,
+    },
+    "lexer": {
+        "color": "#D9D7CE",  # Styles no scheme below names
+        "paper": "#2b2b2b",  # Every style
+        "default_color": "#CCCCCC",
+        "default_paper": "#2b2b2b",
+        "font": "Consolas",
+        "font_size": 10,
+    },
+    # Colours by QScintilla style name. "*" applies to every language, then the
+    # language's own entries by QsciLexer.language() on top. The older
+    # per-language schemes were always overridden by the global one, so their
+    # entries the global scheme names are left out and "*" shows through.
+    "styles": {
+        "*": GLOBAL_COLOR_SCHEME,
+        "JSON": language_scheme(CUSTOM_JSON_COLOR_SCHEME),
+        "JavaScript": language_scheme(JAVASCRIPT_DARK_COLOR_SCHEME),
+        "YAML": language_scheme(CUSTOM_YAML_COLOR_SCHEME),
+        "HTML": language_scheme(HTML_JS_DARK_COLOR_SCHEME),
+    },
+}
+
+
+def base_lexer_class(lexer):
+    # The plain QScintilla lexer behind one of our themed subclasses
+    for cls in type(lexer).__mro__:
+        if cls.__module__ == "PyQt6.Qsci":
+            return cls
+    return type(lexer)
+
+
+def merge_theme(base, overrides):
+    """
+    Returns base with overrides applied, dicts merged key by key so a theme file
+    only needs the values it changes.
+    """
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_theme(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class CompiledTheme:
+    def __init__(self, name, definition):
+        self.name = name
+        self.definition = definition
+        self.colors = {}  # One QColor per distinct colour string
+        self.tables = {}  # Lexer class -> resolved style table
+
+        editor = definition["editor"]
+        self.marginsBackground = self.color(editor["margins_background"])
+        self.marginsForeground = self.color(editor["margins_foreground"])
+        self.foldMargin = [self.color(value) for value in editor["fold_margin"]]
+        self.caretForeground = self.color(editor["caret_foreground"])
+        self.caretLineBackground = self.color(editor["caret_line_background"])
+        self.matchedBraceBackground = self.color(editor["matched_brace_background"])
+        self.matchedBraceForeground = self.color(editor["matched_brace_foreground"])
+        self.unmatchedBraceBackground = self.color(editor["unmatched_brace_background"])
+        self.unmatchedBraceForeground = self.color(editor["unmatched_brace_foreground"])
+        self.text = self.color(editor["text"])
+        self.paper = self.color(editor["paper"])
+        self.font = QFont(editor["font"], editor["font_size"])
+
+        lexer = definition["lexer"]
+        self.lexerColor = self.color(lexer["color"])
+        self.lexerPaper = self.color(lexer["paper"])
+        self.lexerDefaultColor = self.color(lexer["default_color"])
+        self.lexerDefaultPaper = self.color(lexer["default_paper"])
+        self.lexerFont = QFont(lexer["font"], lexer["font_size"])
+
+        styles = definition["styles"]
+        self.styles = {
+            language: [(name, self.color(value)) for name, value in {**styles.get("*", {}), **colors}.items()]
+            for language, colors in styles.items()
+        }
+
+    def color(self, value):
+        color = self.colors.get(value)
+        if color is None:
+            color = QColor(value)
+            if not color.isValid():
+                raise ValueError(f"Invalid colour {value!r} in theme {self.name}")
+            self.colors[value] = color
+        return color
+
+    def styleEditor(self, editor):
+        """
+        Applies the editor colours. Changing the lexer resets the margin and brace
+        styles, so this runs again after every setLexer.
+        """
+        if editor.lexer() is None:
+            # These reset every style, so they go before the margin colours
+            editor.setFont(self.font)
+            editor.setColor(self.text)
+            editor.setPaper(self.paper)
+        editor.setMarginsBackgroundColor(self.marginsBackground)
+        editor.setMarginsForegroundColor(self.marginsForeground)
+        editor.setFoldMarginColors(*self.foldMargin)
+        editor.setCaretForegroundColor(self.caretForeground)
+        editor.setCaretLineBackgroundColor(self.caretLineBackground)
+        editor.setMatchedBraceBackgroundColor(self.matchedBraceBackground)
+        editor.setMatchedBraceForegroundColor(self.matchedBraceForeground)
+        editor.setUnmatchedBraceBackgroundColor(self.unmatchedBraceBackground)
+        editor.setUnmatchedBraceForegroundColor(self.unmatchedBraceForeground)
+
+    def styleLexer(self, lexer):
+        default_color, default_paper, default_font, styles = self.table(lexer)
+        lexer.setDefaultColor(default_color)
+        lexer.setDefaultPaper(default_paper)
+        lexer.setDefaultFont(default_font)
+        for style, color, paper, font, eolFill in styles:
+            lexer.setColor(color, style)
+            lexer.setPaper(paper, style)
+            lexer.setFont(font, style)
+            lexer.setEolFill(eolFill, style)
+        lexer.theme = self  # Compared by identity, a recompiled theme file keeps its name
+
+    def table(self, lexer):
+        lexerClass = base_lexer_class(lexer)
+        table = self.tables.get(lexerClass)
+        if table is None:
+            table = self.tables[lexerClass] = self.resolveTable(lexerClass)
+        return table
+
+    def resolveTable(self, lexerClass):
+        # Styled by name on a fresh lexer, so nothing is left over from another theme
+        lexer = lexerClass()
+        # Must precede setPaper, which fixes each style's colour at the current default
+        lexer.setDefaultColor(self.lexerColor)
+        lexer.setPaper(self.lexerPaper)
+        lexer.setFont(self.lexerFont)
+        for name, color in self.styles.get(lexer.language(), self.styles.get("*", [])):
+            style = getattr(lexer, name, None)
+            if isinstance(style, int):
+                lexer.setColor(color, style)
+            else:
+                logger.debug("Style %s not found in %s", name, lexerClass.__name__)
+        lexer.setDefaultColor(self.lexerDefaultColor)
+        lexer.setDefaultPaper(self.lexerDefaultPaper)
+        lexer.setDefaultFont(self.lexerFont)
+
+        # Same styles QsciScintilla.setLexer reads, the ones with a description
+        styles = [
+            (style, lexer.color(style), lexer.paper(style), lexer.font(style), lexer.eolFill(style))
+            for style in range(QsciScintillaBase.STYLE_MAX + 1) if lexer.description(style)
+        ]
+        # The no-argument defaults are hidden by the per-style overloads in the subclasses
+        return QsciLexer.defaultColor(lexer), QsciLexer.defaultPaper(lexer), QsciLexer.defaultFont(lexer), styles
+
+
+def compile_theme(name, definition):
+    try:
+        return CompiledTheme(name, definition)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Theme {name} is missing or has a malformed entry: {e}") from e
+
+
+class ThemeEngine:
+    """
+    Holds the current compiled theme. Compiled themes are kept, so switching back
+    and forth costs nothing; a theme file is compiled again once it changes.
+    """
+
+    def __init__(self):
+        self.theme = None
+        self.compiled = {}  # Name -> (file mtime, CompiledTheme)
+
+    def current(self):
+        if self.theme is None:
+            self.theme = self.load(DEFAULT_THEME)
+        return self.theme
+
+    def directory(self):
+        from pyeasyedit.pyeasylib import get_config_directory
+        return os.path.join(get_config_directory(), THEMES_DIRECTORY)
+
+    def available(self):
+        try:
+            names = [os.path.splitext(name)[0] for name in os.listdir(self.directory()) if name.endswith(".json")]
+        except OSError:
+            names = []
+        return [DEFAULT_THEME] + sorted(name for name in names if name != DEFAULT_THEME)
+
+    def load(self, name):
+        """
+        Returns the compiled theme called name. Raises OSError or ValueError for a
+        theme file that is missing or broken.
+        """
+        if name == DEFAULT_THEME:
+            path, mtime = None, None
+        else:
+            path = os.path.join(self.directory(), name + ".json")
+            mtime = os.stat(path).st_mtime_ns
+        cached = self.compiled.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        definition = DARK_THEME
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as file:
+                overrides = json.load(file)
+            if not isinstance(overrides, dict):
+                raise ValueError(f"Theme {name} must be a JSON object")
+            definition = merge_theme(DARK_THEME, overrides)
+        theme = compile_theme(name, definition)
+        self.compiled[name] = (mtime, theme)
+        return theme
+
+    def setTheme(self, name):
+        self.theme = self.load(name)
+        return self.theme
+
+
+THEME_ENGINE = ThemeEngine()
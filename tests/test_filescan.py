@@ -0,0 +1,115 @@
+import os
+import re
+
+from pyeasyedit import filescan
+from pyeasyedit.filescan import find_in_data, in_scope, replace_in_data, scan_file, split_globs, walk_files
+
+
+def make_tree(root, paths):
+    for path in paths:
+        full_path = os.path.join(root, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as file:
+            file.write(b"x\n")
+
+
+def relative(root, paths):
+    return [os.path.relpath(path, root).replace(os.sep, "/") for path in paths]
+
+
+def test_walk_files_yields_files_before_subdirectories(tmp_path):
+    make_tree(tmp_path, ["b.txt", "a/z.txt", "a/b/c.txt", "c/d.txt"])
+    assert relative(tmp_path, walk_files(str(tmp_path))) == ["b.txt", "a/z.txt", "a/b/c.txt", "c/d.txt"]
+
+
+def test_walk_files_prunes_excluded_directories(tmp_path):
+    make_tree(tmp_path, ["src/main.py", ".git/config", "node_modules/lib/index.js", "src/build/out.py"])
+    excludes = split_globs(".git, node_modules; src/build")
+    assert relative(tmp_path, walk_files(str(tmp_path), excludes=excludes)) == ["src/main.py"]
+
+
+def test_walk_files_includes_match_name_or_relative_path(tmp_path):
+    make_tree(tmp_path, ["a.py", "a.txt", "docs/b.py", "docs/c.txt"])
+    assert relative(tmp_path, walk_files(str(tmp_path), includes=["*.py"])) == ["a.py", "docs/b.py"]
+    assert relative(tmp_path, walk_files(str(tmp_path), includes=["docs/*.txt"])) == ["docs/c.txt"]
+
+
+def test_walk_files_stops_when_cancelled(tmp_path):
+    make_tree(tmp_path, ["a.txt", "b/c.txt"])
+    assert list(walk_files(str(tmp_path), isCancelled=lambda: True)) == []
+
+
+def test_in_scope_agrees_with_walk_files(tmp_path):
+    make_tree(tmp_path, ["a.py", "a.txt", "build/b.py", "src/c.py", "src/build/d.py"])
+    includes, excludes = ["*.py"], ["build"]
+    walked = set(walk_files(str(tmp_path), includes, excludes))
+    for path in ["a.py", "a.txt", "build/b.py", "src/c.py", "src/build/d.py"]:
+        full_path = os.path.join(str(tmp_path), *path.split("/"))
+        assert in_scope(str(tmp_path), full_path, includes, excludes) == (full_path in walked), path
+
+
+def test_in_scope_rejects_paths_outside_root(tmp_path):
+    root = os.path.join(str(tmp_path), "root")
+    assert not in_scope(root, root)
+    assert not in_scope(root, os.path.join(str(tmp_path), "other.py"))
+
+
+def test_find_in_data_lines_columns_and_previews():
+    data = "first line\n  héllo world\nhello again\n".encode("utf-8")
+    assert find_in_data(data, re.compile(rb"world|hello")) == [
+        (1, 8, "héllo world"),
+        (2, 0, "hello again"),
+    ]
+
+
+def test_find_in_data_skips_binary():
+    assert find_in_data(b"match\0match", re.compile(b"match")) == []
+
+
+def test_find_in_data_skips_zero_width_matches():
+    assert find_in_data(b"ab\ncd\n", re.compile(rb"^|b", re.MULTILINE)) == [(0, 1, "ab")]
+
+
+def test_find_in_data_caps_matches_per_file(monkeypatch):
+    monkeypatch.setattr(filescan, "MAX_MATCHES_PER_FILE", 3)
+    assert len(find_in_data(b"a" * 10, re.compile(b"a"))) == 3
+
+
+def test_scan_file_maps_large_files(tmp_path, monkeypatch):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"noise\n" * 100 + b"needle here\n")
+    seen = []
+
+    def spy(data, pattern):
+        seen.append(type(data))
+        return find_in_data(data, pattern)
+
+    monkeypatch.setattr(filescan, "find_in_data", spy)
+    monkeypatch.setattr(filescan, "MMAP_THRESHOLD", 64)
+    assert scan_file(str(path), re.compile(b"needle")) == [(100, 0, "needle here")]
+    assert seen == [filescan.mmap.mmap]
+
+
+def test_scan_file_reads_small_and_empty_files(tmp_path):
+    small = tmp_path / "small.txt"
+    small.write_bytes(b"needle\n")
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert scan_file(str(small), re.compile(b"needle")) == [(0, 0, "needle")]
+    assert scan_file(str(empty), re.compile(b"needle")) == []
+
+
+def test_replace_in_data_plain_replacement_is_literal():
+    pattern = re.compile(re.escape(b"a.b"))
+    assert replace_in_data(b"a.b axb a.b", pattern, r"\1 é") == ("\\1 é axb \\1 é".encode("utf-8"), 2)
+
+
+def test_replace_in_data_expands_groups():
+    pattern = re.compile(rb"(\w+)@(\w+)")
+    assert replace_in_data(b"ann@host bob@box", pattern, r"\2:\1", regex=True) == (b"host:ann box:bob", 2)
+    assert replace_in_data(b"x=1", re.compile(rb"(?P<key>\w)=(?P<value>\d)"), r"\g<value>=\g<key>", regex=True) \
+        == (b"1=x", 1)
+
+
+def test_replace_in_data_zero_width_matches():
+    assert replace_in_data(b"ab\ncd", re.compile(rb"^", re.MULTILINE), "> ", regex=True) == (b"> ab\n> cd", 2)
@@ -0,0 +1,37 @@
+from pyeasyedit.profiling import Histogram
+
+
+def test_histogram_buckets_by_upper_bound():
+    histogram = Histogram(bounds=(1, 10, 100))
+    for milliseconds in (0.5, 1, 5, 10, 50, 500):
+        histogram.add(milliseconds)
+    assert histogram.counts == [2, 2, 1, 1]
+    assert histogram.count == 6
+    assert histogram.maximum == 500
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(bounds=(1, 10, 100))
+    for milliseconds in [0.5] * 50 + [5] * 40 + [50] * 9 + [250]:
+        histogram.add(milliseconds)
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(0.9) == 10
+    assert histogram.percentile(0.99) == 100
+    assert histogram.percentile(1.0) == 250  # Past the last bound, the maximum
+
+
+def test_histogram_to_dict():
+    histogram = Histogram(bounds=(1, 10))
+    histogram.add(2)
+    histogram.add(4)
+    summary = histogram.toDict()
+    assert summary["count"] == 2
+    assert summary["mean_ms"] == 3
+    assert summary["max_ms"] == 4
+    assert summary["buckets"] == {"<=1ms": 0, "<=10ms": 2, ">10ms": 0}
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.summary() == "no samples"
+    assert histogram.toDict()["mean_ms"] == 0.0
@@ -0,0 +1,136 @@
+import re
+
+import pytest
+from PyQt6.Qsci import QsciScintilla
+
+from pyeasyedit.search import apply_replacements, compile_pattern, find_matches, find_next, find_previous, \
+    replace_all
+
+
+class FakeEditor:
+    """
+    The parts of the editor's Scintilla API the search functions use, over a
+    bytearray.
+    """
+
+    def __init__(self, text):
+        self.data = bytearray(text)
+        self.target = (0, 0)
+        self.edits = 0
+
+    def documentBuffer(self):
+        return memoryview(bytes(self.data))
+
+    def rangeBuffer(self, start, end):
+        return memoryview(bytes(self.data[start:end]))
+
+    def setUpdatesEnabled(self, enabled):
+        pass
+
+    def lineStarts(self):
+        return [0] + [i + 1 for i, byte in enumerate(self.data) if byte == ord("\n")]
+
+    def SendScintilla(self, message, *args):
+        starts = self.lineStarts()
+        if message == QsciScintilla.SCI_SETTARGETRANGE:
+            self.target = args
+        elif message == QsciScintilla.SCI_REPLACETARGET:
+            start, end = self.target
+            self.data[start:end] = args[1][:args[0]]
+            self.edits += 1
+        elif message == QsciScintilla.SCI_LINEFROMPOSITION:
+            return sum(1 for start in starts if start <= args[0]) - 1
+        elif message == QsciScintilla.SCI_GETLINECOUNT:
+            return len(starts)
+        elif message == QsciScintilla.SCI_POSITIONFROMLINE:
+            return starts[args[0]]
+        elif message == QsciScintilla.SCI_GETLINEENDPOSITION:
+            end = self.data.find(b"\n", starts[args[0]])
+            return len(self.data) if end == -1 else end
+        else:
+            raise AssertionError(f"unexpected message {message}")
+
+
+def test_compile_pattern_escapes_plain_text():
+    pattern = compile_pattern("a.b(")
+    assert pattern.search(b"a.b(") and not pattern.search(b"axb(")
+
+
+def test_compile_pattern_options():
+    assert compile_pattern("Foo", caseSensitive=False).search(b"FOO")
+    assert not compile_pattern("Foo").search(b"FOO")
+    whole = compile_pattern("cat", wholeWord=True)
+    assert [m.span() for m in whole.finditer(b"cat concat cat_ cat.")] == [(0, 3), (16, 19)]
+    assert compile_pattern("^x", regex=True).findall(b"x\nx") == [b"x", b"x"]  # Multiline
+
+
+def test_compile_pattern_is_utf8_and_cached():
+    assert compile_pattern("é").pattern == "é".encode("utf-8")
+    assert compile_pattern("é") is compile_pattern("é")
+
+
+def test_compile_pattern_raises_for_bad_regex():
+    with pytest.raises(re.error):
+        compile_pattern("(", regex=True)
+
+
+def test_find_next_wraps_round():
+    editor = FakeEditor(b"one two one")
+    pattern = compile_pattern("one")
+    assert find_next(editor, pattern, 0) == (0, 3)
+    assert find_next(editor, pattern, 1) == (8, 11)
+    assert find_next(editor, pattern, 9) == (0, 3)
+    assert find_next(editor, compile_pattern("three"), 0) is None
+
+
+def test_find_next_skips_zero_width_matches():
+    editor = FakeEditor(b"ab\ncd")
+    assert find_next(editor, compile_pattern(r"^|d", regex=True), 0) == (4, 5)
+    assert find_next(editor, compile_pattern(r"x*", regex=True), 0) is None
+
+
+def test_find_previous_wraps_round():
+    editor = FakeEditor(b"one two one")
+    pattern = compile_pattern("one")
+    assert find_previous(editor, pattern, 11) == (8, 11)
+    assert find_previous(editor, pattern, 8) == (0, 3)
+    assert find_previous(editor, pattern, 0) == (8, 11)
+    assert find_previous(editor, compile_pattern(r"^", regex=True), 5) is None
+
+
+def test_apply_replacements_is_one_edit():
+    editor = FakeEditor(b"a-b-c-d")
+    matches = [(1, 2, b"+"), (3, 4, b""), (5, 6, b"==")]
+    assert apply_replacements(editor, matches) == 3
+    assert bytes(editor.data) == b"a+bc==d"
+    assert editor.edits == 1
+    assert apply_replacements(editor, []) == 0 and editor.edits == 1
+
+
+def test_replace_all_expands_groups():
+    editor = FakeEditor(b"x = 1\ny = 22\n")
+    assert replace_all(editor, r"(\w) = (\d+)", r"\2 = \1", regex=True) == 2
+    assert bytes(editor.data) == b"1 = x\n22 = y\n"
+
+
+def test_find_matches_expands_groups_that_look_at_the_previous_line():
+    # The lookbehind reaches into the previous line, the replacement still matches re.sub
+    text = b"key\nvalue1\nkey\nvalue2\n"
+    pattern = compile_pattern(r"(?<=key\n)(\w+?)(\d)", regex=True)
+    editor = FakeEditor(text)
+    matches = find_matches(editor, pattern, r"\2\1", regex=True)
+    assert [replacement for _, _, replacement in matches] == [b"1value", b"2value"]
+    apply_replacements(editor, matches)
+    assert bytes(editor.data) == pattern.sub(rb"\2\1", text)
+
+
+def test_replace_all_zero_width_matches():
+    editor = FakeEditor(b"ab\ncd")
+    assert replace_all(editor, "^", "> ", regex=True) == 2
+    assert bytes(editor.data) == b"> ab\n> cd"
+
+
+def test_replace_all_plain_replacement_is_literal():
+    editor = FakeEditor(b"a.b")
+    assert replace_all(editor, "a.b", r"\1") == 1
+    assert bytes(editor.data) == rb"\1"
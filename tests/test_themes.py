@@ -0,0 +1,23 @@
+from pyeasyedit.themes import merge_theme
+
+
+def test_merge_theme_merges_nested_dicts():
+    base = {"name": "Dark", "editor": {"paper": "#000", "color": "#fff"}, "languages": {"Python": {"Comment": "#0f0"}}}
+    overrides = {"editor": {"paper": "#111"}, "languages": {"Python": {"Keyword": "#ff0"}, "JSON": {"Key": "#f00"}}}
+    assert merge_theme(base, overrides) == {
+        "name": "Dark",
+        "editor": {"paper": "#111", "color": "#fff"},
+        "languages": {"Python": {"Comment": "#0f0", "Keyword": "#ff0"}, "JSON": {"Key": "#f00"}},
+    }
+
+
+def test_merge_theme_replaces_non_dict_values():
+    assert merge_theme({"font": {"family": "Mono"}, "size": 10}, {"font": "Courier", "size": {"pt": 12}}) == \
+        {"font": "Courier", "size": {"pt": 12}}
+
+
+def test_merge_theme_leaves_base_untouched():
+    base = {"editor": {"paper": "#000"}}
+    merged = merge_theme(base, {"editor": {"paper": "#111"}})
+    merged["editor"]["color"] = "#fff"
+    assert base == {"editor": {"paper": "#000"}}